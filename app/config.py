@@ -1,4 +1,5 @@
 from pydantic import BaseSettings
+from typing import Dict
 
 
 class Settings(BaseSettings):
@@ -11,6 +12,45 @@ class Settings(BaseSettings):
     ALGORITHM: str
     CLIENT_ORIGIN: str
     RABBITMQ_URL: str
+    USER_CACHE_MAXSIZE: int = 10000
+    USER_CACHE_TTL: int = 60
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_EXECUTOR: str = "thread"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_CONCURRENCY: int = 8
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_INTERVAL: float = 1.0
+    OUTBOX_LEASE_SECONDS: int = 30
+    OUTBOX_MAX_ATTEMPTS: int = 10
+    RABBIT_PREFETCH_COUNT: int = 32
+    RABBIT_CONSUMER_CONCURRENCY: int = 16
+    RABBIT_QUEUE_CONCURRENCY: Dict[str, int] = {}
+    RABBIT_DRAIN_TIMEOUT: float = 30.0
+    TEAM_EVENT_SHARDS: int = 16
+    # Every replica consumes every shard; these only pick the shards this
+    # replica is preferred for (see RabbitClient.start_team_consumers).
+    CONSUMER_REPLICA_INDEX: int = 0
+    CONSUMER_REPLICA_COUNT: int = 1
+    RABBIT_PUBLISH_CHANNELS: int = 4
+    RABBIT_CONTENT_TYPE: str = "application/json"
+    WS_HEARTBEAT_INTERVAL: float = 30.0
+    WS_HEARTBEAT_TIMEOUT: float = 75.0
+    WS_HEARTBEAT_SLOTS: int = 30
+    CACHE_BACKEND: str = "memory"
+    CACHE_TTLS: Dict[str, int] = {"teams": 30, "push_token": 60}
+    CACHE_MAXSIZE: int = 10000
+    REDIS_URL: str = "redis://localhost:6379/0"
+    CALENDAR_MAX_DAYS: int = 92
+    PUSH_RECEIPT_DELAY: int = 900
+    PUSH_RECEIPT_POLL_INTERVAL: float = 60.0
+    PUSH_RECEIPT_BATCH_SIZE: int = 1000
+    PUSH_RATE_LIMIT: float = 600.0
+    PUSH_RATE_BURST: float = 600.0
+    PUSH_MAX_ATTEMPTS: int = 5
+    PUSH_RETRY_BASE_DELAY: float = 2.0
+    PUSH_MAX_DEVICES: int = 10
+    NOTIFY_COALESCE_WINDOW: float = 5.0
+    NOTIFY_COALESCE_MAX_WAIT: float = 30.0
 
     class Config:
         env_file = "./.env"
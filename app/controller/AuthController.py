@@ -32,14 +32,14 @@ class AuthController(BaseController):
         team_ids = payload.teams
         team_ids = [utils.ensure_object_id(team_id) for team_id in team_ids]
         user_data["teams"] = team_ids
-        for team_id in payload.teams:
-            if not await self.team_service.check_team_exists(team_id):
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Team with id {team_id} not found",
-                )
+        missing_teams = await self.team_service.missing_ids(team_ids)
+        if missing_teams:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Team with id {', '.join(map(str, missing_teams))} not found",
+            )
 
-        hashed_password = self.hash_handler(user_data["password"])
+        hashed_password = await self.hash_handler(user_data["password"])
         user_data["password"] = hashed_password
         user_data.pop("passwordConfirm", None)
 
@@ -161,7 +161,7 @@ class AuthController(BaseController):
         try:
             # Assuming user is a dict and user['_id'] exists
             user_id = user["_id"]  # Ensure this is the correct key for user ID
-            result = await self, push_token_service.save_token(payload, user_id)
+            result = await self.token_service.save_token(payload, user_id)
             return {"result": payload.dict()}  # Return payload as a dictionary
         except Exception as e:
             raise HTTPException(status_code=400, detail=str(e))
@@ -7,7 +7,7 @@ from ..service.TeamService import TeamService
 from ..service.EventService import EventService
 from ..service.UserService import UserService
 from ..oauth2 import require_user
-from ..utils import hash_password, verify_password, ensure_object_id
+from ..utils import hash_password_async, verify_password_async, ensure_object_id
 
 
 class BaseController:
@@ -17,8 +17,8 @@ class BaseController:
         self.team_service = TeamService()
         self.event_service = EventService()
         self.auth_service = AuthService()
-        self.hash_handler = hash_password
-        self.verify_hash = verify_password
+        self.hash_handler = hash_password_async
+        self.verify_hash = verify_password_async
         self.format_handler = ensure_object_id
         self.require_user = require_user
 
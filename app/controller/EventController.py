@@ -1,15 +1,27 @@
 from fastapi import FastAPI, HTTPException, Depends, status, Request, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from ..oauth2 import require_user
-from ..models.event_schemas import CreateEventSchema
+from ..models.event_schemas import (
+    CalendarSchema,
+    CreateEventSchema,
+    ListTeamEventSchema,
+)
 from bson import ObjectId
+from bson.errors import InvalidId
+from datetime import timedelta
+from app.config import settings
 from ..utils import ensure_object_id
+from ..tools.JSONResponse import MongoJSONResponse
+from ..tools.MessageCodec import encode_body
 from .BaseController import BaseController
 
 # from ...main import rabbit_client
 
 
 class EventController(BaseController):
+    DEFAULT_PAGE_SIZE = 50
+
     async def create_event(
         self,
         event: CreateEventSchema,
@@ -24,34 +36,40 @@ class EventController(BaseController):
         event_data = event.dict()
         event_data["creator_id"] = ensure_object_id(user["_id"])
         event_data["team_id"] = self.format_handler(event_data["team_id"])
-        # Call to your service layer to save the event asynchronously
-        created_event = await self.event_service.create(event_data)
+        # The notification is written to the outbox in the same transaction
+        # and published by the relay, off the request path.
+        created_event = await self.event_service.create_with_notification(
+            event_data, action="created"
+        )
         if not created_event:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Could not create event",
             )
-
-        # Publishing a message to RabbitMQ asynchronously
-        await app.rabbit_client.publish_message(
-            routing_key=f"team.{event_data['team_id']}.event.created",
-            message={"event": created_event, "action": "created"},
-        )
+        app.outbox_relay.notify()
         return created_event
 
     async def read_event(self, event_id: str):
         event = await self.event_service.get_by_id(event_id)
         if not event:
             raise HTTPException(status_code=404, detail="Event not found")
-        return event
+        return MongoJSONResponse(event)
 
-    async def update_event(self, event_id: str, event: CreateEventSchema):
+    async def update_event(
+        self, event_id: str, event: CreateEventSchema, request: Request
+    ):
         # update
-        updated_event = await self.event_service.update(
-            ObjectId(event_id), event.dict(exclude_unset=True)
+        update_data = event.dict(exclude_unset=True)
+        if "team_id" in update_data:
+            update_data["team_id"] = self.format_handler(update_data["team_id"])
+        # Published through the outbox like create_event; the consumer
+        # coalesces bursts of edits into one push.
+        updated_event = await self.event_service.update_with_notification(
+            ObjectId(event_id), update_data, action="updated"
         )
         if not updated_event:
             raise HTTPException(status_code=404, detail="Event not found")
+        request.app.outbox_relay.notify()
         return updated_event
 
     async def delete_event(self, event_id: str):
@@ -59,11 +77,104 @@ class EventController(BaseController):
         # raise HTTPException(status_code=404, detail="Event not found")
         return result
 
-    async def list_events(self, team_id: str):
-        team_id = ensure_object_id(team_id)
-        query = {"team_id": team_id}
-        events = await self.event_service.list(query)
-        return events
+    async def list_events(self, payload: ListTeamEventSchema):
+        if payload.after and payload.before:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Pass either after or before, not both",
+            )
+        query = {"team_id": ensure_object_id(payload.team_id)}
+        if payload.start_date or payload.end_date:
+            query["event_date"] = {}
+            if payload.start_date:
+                query["event_date"]["$gte"] = payload.start_date
+            if payload.end_date:
+                query["event_date"]["$lt"] = payload.end_date
+
+        if payload.format == "ndjson":
+            # The export always runs oldest first; the cursors only bound it.
+            cursor, op = payload.after, "$gt"
+            if payload.before:
+                cursor, op = payload.before, "$lt"
+            if cursor:
+                try:
+                    keyset = self.event_service.keyset_filter("event_date", cursor, op)
+                except ValueError as e:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+                    )
+                query = {"$and": [query, keyset]}
+            return StreamingResponse(
+                self._stream_events(query, payload.limit),
+                media_type="application/x-ndjson",
+            )
+
+        try:
+            page = await self.event_service.paginate(
+                query,
+                sort_field="event_date",
+                limit=payload.limit or self.DEFAULT_PAGE_SIZE,
+                after=payload.after,
+                before=payload.before,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        return MongoJSONResponse(
+            {
+                "events": page["items"],
+                "next_cursor": page["next_cursor"],
+                "prev_cursor": page["prev_cursor"],
+            }
+        )
+
+    async def calendar(self, payload: CalendarSchema, user: dict):
+        if payload.end_date <= payload.start_date:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="end_date must be after start_date",
+            )
+        if payload.end_date - payload.start_date > timedelta(
+            days=settings.CALENDAR_MAX_DAYS
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Date range is limited to {settings.CALENDAR_MAX_DAYS} days",
+            )
+
+        member_of = {str(team_id) for team_id in user.get("teams", [])}
+        team_ids = payload.team_ids
+        if team_ids is None:
+            team_ids = member_of
+        else:
+            foreign = sorted(set(team_ids) - member_of)
+            if foreign:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail={"not_a_member": foreign},
+                )
+        try:
+            page = await self.event_service.calendar(
+                team_ids,
+                payload.start_date,
+                payload.end_date,
+                limit=payload.limit or self.DEFAULT_PAGE_SIZE,
+                after=payload.after,
+            )
+        except (ValueError, InvalidId) as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        return MongoJSONResponse(
+            {"events": page["items"], "next_cursor": page["next_cursor"]}
+        )
+
+    async def _stream_events(self, query: dict, limit: int = None):
+        sent = 0
+        async for event in self.event_service.stream(
+            query, sort=[("event_date", 1), ("_id", 1)]
+        ):
+            yield encode_body(event) + b"\n"
+            sent += 1
+            if limit and sent >= limit:
+                break
 
 
 # , user: dict = Depends(require_user)
@@ -1,5 +1,9 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import OperationFailure
 import asyncio
+import logging
+import time
 from app.config import settings
 
 
@@ -17,7 +21,91 @@ Event = db.events
 Team = db.teams
 Push_Token = db.push_token
 User_Info = db.user_info
-# Creating an index asynchronously
-# Add more async operations as needed
-# Example: inserting a document
-# await user_collection.insert_one({"email": "example@example.com", "name": "Example User"})
+Outbox = db.outbox
+Push_Receipt = db.push_receipts
+
+# Declared indexes per collection. ensure_indexes() creates whatever is
+# missing at startup; create_indexes is a no-op for indexes that already
+# exist with the same spec.
+INDEXES = {
+    Auth: [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("teams", ASCENDING)], name="teams"),
+    ],
+    Event: [
+        IndexModel(
+            [("team_id", ASCENDING), ("event_date", ASCENDING), ("_id", ASCENDING)],
+            name="team_id_event_date",
+        ),
+    ],
+    Push_Token: [
+        IndexModel([("devices.token", ASCENDING)], name="devices_token"),
+        # Legacy single-token documents, until their owners re-register.
+        IndexModel([("token", ASCENDING)], name="token"),
+    ],
+    Team: [
+        IndexModel([("team_players", ASCENDING)], name="team_players"),
+        IndexModel([("team_coaches", ASCENDING)], name="team_coaches"),
+    ],
+    Outbox: [
+        IndexModel([("status", ASCENDING), ("created_at", ASCENDING)], name="status"),
+        IndexModel(
+            [("sent_at", ASCENDING)],
+            name="sent_at_ttl",
+            expireAfterSeconds=7 * 24 * 3600,
+        ),
+    ],
+    Push_Receipt: [
+        IndexModel([("check_after", ASCENDING)], name="check_after"),
+        # Expo only keeps receipts for a day; later polls would be wasted.
+        IndexModel(
+            [("created_at", ASCENDING)],
+            name="created_at_ttl",
+            expireAfterSeconds=24 * 3600,
+        ),
+    ],
+}
+
+
+async def ensure_indexes(indexes: dict = INDEXES) -> dict:
+    """Creates the declared indexes and reports build time and drift.
+
+    Each index is created on its own, so one conflict does not keep the
+    other indexes of the collection from being built. Returns a report per
+    collection with the elapsed build time, the live indexes that are not
+    declared in INDEXES, the declared indexes that are still missing and,
+    by name, the error of every declared index that conflicts with a live
+    one. Drift is only logged, never repaired.
+    """
+    report = {}
+    for collection, models in indexes.items():
+        started = time.perf_counter()
+        conflicts = {}
+        for model in models:
+            name = model.document["name"]
+            try:
+                await collection.create_indexes([model])
+            except OperationFailure as e:
+                # An index with the same name or keys but different options
+                # already exists; leave it alone and surface it as drift.
+                conflicts[name] = str(e)
+                logging.error(f"Index drift on {collection.name}.{name}: {e}")
+        elapsed = time.perf_counter() - started
+
+        declared = {model.document["name"] for model in models} | {"_id_"}
+        live = {index["name"] async for index in collection.list_indexes()}
+        undeclared = sorted(live - declared)
+        missing = sorted(declared - live)
+
+        report[collection.name] = {
+            "build_seconds": round(elapsed, 3),
+            "undeclared": undeclared,
+            "missing": missing,
+            "conflicts": conflicts,
+        }
+        logging.info(
+            f"Indexes on {collection.name} ensured in {elapsed:.3f}s"
+            + (f", undeclared: {undeclared}" if undeclared else "")
+            + (f", missing: {missing}" if missing else "")
+        )
+    return report
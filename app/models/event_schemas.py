@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, conint
 from datetime import datetime
-from typing import Optional, Literal
+from typing import List, Optional, Literal
 from bson.objectid import ObjectId
 import struct
 import pydantic
@@ -14,7 +14,6 @@ class BeeObjectId(ObjectId):
 
 pydantic.json.ENCODERS_BY_TYPE[ObjectId] = str
 pydantic.json.ENCODERS_BY_TYPE[BeeObjectId] = str
-pydantic.json.ENCODERS_BY_TYPE[datetime] = str
 
 
 class CreateEventSchema(BaseModel):
@@ -48,3 +47,41 @@ class CreateEventSchema(BaseModel):
 
 class ListTeamEventSchema(BaseModel):
     team_id: str
+    limit: Optional[conint(gt=0, le=500)] = None
+    after: Optional[str] = None
+    before: Optional[str] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    format: Literal["json", "ndjson"] = "json"
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "team_id": "663be0c3b6f73eaa9b08b048",
+                "limit": 50,
+                "after": None,
+                "start_date": "2024-01-01T00:00:00",
+                "end_date": "2024-07-01T00:00:00",
+                "format": "json",
+            }
+        }
+
+
+class CalendarSchema(BaseModel):
+    # Omit team_ids to get the calendar of every team the user belongs to.
+    team_ids: Optional[List[str]] = None
+    start_date: datetime
+    end_date: datetime
+    limit: Optional[conint(gt=0, le=500)] = None
+    after: Optional[str] = None
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "team_ids": ["663be0c3b6f73eaa9b08b048"],
+                "start_date": "2024-05-01T00:00:00",
+                "end_date": "2024-06-01T00:00:00",
+                "limit": 50,
+                "after": None,
+            }
+        }
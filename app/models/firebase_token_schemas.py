@@ -18,6 +18,8 @@ class PydanticObjectId(BsonObjectId):
 
 class PushTokenSchema(BaseModel):
     token: str
+    # Clients that predate multi-device support all share one slot.
+    device_id: str = "default"
     _id: PydanticObjectId
 
     class Config:
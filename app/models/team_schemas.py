@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, conlist
 from typing import List
 from datetime import datetime
 from typing import Optional, Literal
@@ -36,8 +36,8 @@ class PlayerTokenRequest(BaseModel):
 
 
 class UserInsert(BaseModel):
-    team_ids: List[str]
-    user_ids: List[str]
+    team_ids: conlist(str, min_items=1)
+    user_ids: conlist(str, min_items=1)
 
     class Config:
         orm_mode = True
@@ -46,3 +46,28 @@ class UserInsert(BaseModel):
 
 class TeamPlayers(BaseModel):
     team_id: str
+
+
+class MembershipPair(BaseModel):
+    user_id: str
+    team_id: str
+
+
+class BulkMembershipSchema(BaseModel):
+    memberships: conlist(MembershipPair, min_items=1, max_items=10000)
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "memberships": [
+                    {
+                        "user_id": "663be0c3b6f73eaa9b08b041",
+                        "team_id": "663be0c3b6f73eaa9b08b048",
+                    },
+                    {
+                        "user_id": "663be0c3b6f73eaa9b08b042",
+                        "team_id": "663be0c3b6f73eaa9b08b048",
+                    },
+                ]
+            }
+        }
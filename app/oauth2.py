@@ -50,7 +50,7 @@ async def require_user(Authorize: AuthJWT = Depends()):
     try:
         Authorize.jwt_required()
         user_id = Authorize.get_jwt_subject()
-        user = await auth_service.get_by_id(user_id)
+        user = await auth_service.get_cached_user(user_id)
 
         if not user:
             raise UserNotFound("User no longer exists")
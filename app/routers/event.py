@@ -1,6 +1,10 @@
 from fastapi import APIRouter, status, Depends, HTTPException, Request
 from ..controller.EventController import EventController
-from ..models.event_schemas import CreateEventSchema, ListTeamEventSchema
+from ..models.event_schemas import (
+    CalendarSchema,
+    CreateEventSchema,
+    ListTeamEventSchema,
+)
 from ..oauth2 import require_user
 from .BaseRouter import BaseRouter
 
@@ -35,11 +39,17 @@ class EventRouter(BaseRouter):
 
         @self.router.post("/list")
         async def list_events(request: ListTeamEventSchema):
-            return await self.event_controller.list_events(request.team_id)
+            return await self.event_controller.list_events(request)
+
+        @self.router.post("/calendar")
+        async def calendar(payload: CalendarSchema, user: dict = Depends(require_user)):
+            return await self.event_controller.calendar(payload, user)
 
         @self.router.post("/update/{event_id}", status_code=status.HTTP_204_NO_CONTENT)
-        async def update_event(event_id: str, payload: CreateEventSchema):
-            return await self.event_controller.update_event(event_id, payload)
+        async def update_event(
+            event_id: str, payload: CreateEventSchema, request: Request
+        ):
+            return await self.event_controller.update_event(event_id, payload, request)
 
 
 event_router = EventRouter().router
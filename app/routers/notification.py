@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 from ..tools.RabbitClient import RabbitClient
-from ..tools.ExponentServerSDK import push_client, PushMessage
+from ..tools.ExponentServerSDK import async_push_client, PushMessage
 from ..models.notification_schemas import NotificationRequest
 
 router = APIRouter(prefix="/api/notification", tags=["trigger_in"])
@@ -17,7 +17,7 @@ async def send_notification(request: NotificationRequest):
 
     try:
         # Send the notification
-        ticket = push_client.publish(push_message)
+        ticket = await async_push_client.publish(push_message)
         return {"status": "Success", "ticket": ticket}
 
     except Exception as e:
@@ -5,6 +5,7 @@ from ..models.team_schemas import (
     PlayerTokenRequest,
     UserInsert,
     TeamPlayers,
+    BulkMembershipSchema,
 )
 from ..controller.TeamController import TeamController
 from .BaseRouter import BaseRouter
@@ -21,24 +22,30 @@ class TeamRouter(BaseRouter):
         async def create_team(
             team: CreateTeamSchema, request: Request, user: dict = Depends(require_user)
         ):
-            return await TeamController.register_team(team, request, user)
+            return await self.team_controller.register_team(team, request, user)
 
         # NEEDS ADJUSTMENTS NO SERVICE USE ON ROUTER USE ON CONTROLLER INSTEAD
         @self.router.post("/get_token")
         async def get_tokens(request: PlayerTokenRequest):
-            return await push_token_service.get_team_player_tokens(
+            return await self.team_controller.token_service.get_team_player_tokens(
                 team_id=request.team_id
             )
 
         @self.router.post("/insert_users_and_teams")
         async def insert_user(request: UserInsert):
-            return await TeamController.add_user_to_team(
+            return await self.team_controller.add_user_to_team(
                 team_ids=request.team_ids, user_ids=request.user_ids
             )
 
+        @self.router.post("/memberships")
+        async def add_memberships(
+            payload: BulkMembershipSchema, user: dict = Depends(require_user)
+        ):
+            return await self.team_controller.add_memberships(payload, user)
+
         @self.router.post("/get_team_users")
         async def get_team_users(request: TeamPlayers):
-            return await TeamController.get_team_users_by_id(request.team_id)
+            return await self.team_controller.get_team_users_by_id(request.team_id)
 
 
 team_router = TeamRouter().router
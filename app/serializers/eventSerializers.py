@@ -12,7 +12,7 @@ def eventEntity(event) -> dict:
     }
 
 
-def eventResponseEntity(user) -> dict:
+def eventResponseEntity(event) -> dict:
 
     return {
         "name": event.get("name", None),
@@ -20,7 +20,7 @@ def userResponseEntity(user) -> dict:
     return {
         "id": str(user["_id"]),
         "name": user.get("name", None),
-        "email": contact_info.get(
+        "email": user.get("contact_info", {}).get(
             "email", None
         ),  # Safely get the email from contact_info
         "photo": user.get("photo", None),
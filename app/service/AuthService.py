@@ -8,12 +8,40 @@ import logging
 from ..config import settings
 from .MongoDBService import MongoDBService
 from ..database import Auth
+from ..tools.LRUCache import LRUCache
 from pymongo.collection import Collection
 
+# Authenticated users keyed by JWT subject, shared by every AuthService.
+user_cache = LRUCache(maxsize=settings.USER_CACHE_MAXSIZE, ttl=settings.USER_CACHE_TTL)
+
 
 class AuthService(MongoDBService):
+    # Fields the auth dependency needs; never the password hash.
+    SESSION_PROJECTION = {"role": 1, "teams": 1}
+
     def __init__(self):
         super().__init__(Auth)
+        self.user_cache = user_cache
+
+    async def get_cached_user(self, user_id: str):
+        """Returns the user for a JWT subject, hitting Mongo only on a miss."""
+        user = self.user_cache.get(user_id)
+        if user is None:
+            # A role or team change committed while this read is in flight
+            # invalidates the key, and the stale document is not cached.
+            generation = self.user_cache.begin_load(user_id)
+            try:
+                user = await self.get_by_id(
+                    user_id, projection=self.SESSION_PROJECTION
+                )
+            finally:
+                self.user_cache.end_load(user_id, generation, user or None)
+        return dict(user) if user else user
+
+    async def _invalidate(self, *doc_ids) -> None:
+        await super()._invalidate(*doc_ids)
+        for doc_id in doc_ids:
+            self.user_cache.invalidate(str(doc_id))
 
     async def check_user_exists(self, email: str):
         response = await self.collection.find_one({"email": email.lower()})
@@ -27,11 +55,22 @@ class AuthService(MongoDBService):
     async def verify_user_credentials(self, email: str, password: str):
 
         user = await self.collection.find_one({"email": email.lower()})
-        jls_extract_var = user
-        if not user or not utils.verify_password(password, jls_extract_var["password"]):
+        if not user:
+            return None
 
+        valid, new_hash = await utils.verify_and_update_password_async(
+            password, user["password"]
+        )
+        if not valid:
             return None
 
+        if new_hash:
+            # The configured bcrypt cost changed since this hash was made.
+            await self.update(
+                user["_id"], {"password": new_hash}, return_document=False
+            )
+            user["password"] = new_hash
+
         return userEntity(user)
 
     def validate_role(self, user, role):
@@ -45,7 +84,7 @@ class AuthService(MongoDBService):
 
     async def check_role(self, user_id):
         # Check if the user object is None
-        user = await self.get_by_id(ObjectId(user_id))
+        user = await self.get_by_id(ObjectId(user_id), projection={"role": 1})
         if user is None:
             raise ValueError("No user data available to validate role")
 
@@ -1,15 +1,69 @@
 from bson import ObjectId
+from pymongo import ReturnDocument
 from pymongo.collection import Collection
 from datetime import datetime
+from typing import Iterable, Optional
 from app.serializers.eventSerializers import eventEntity
 from .MongoDBService import MongoDBService
+from .OutboxService import OutboxService
 from ..config import settings
 from ..database import Event
+from ..utils import ensure_object_id
 
 
 class EventService(MongoDBService):
     def __init__(self):
         super().__init__(Event)
+        self.outbox_service = OutboxService()
+
+    async def create_with_notification(self, data: dict, action: str = "created"):
+        """Inserts an event and its outbox message in one transaction.
+
+        The notification is published later by OutboxRelay, so the caller
+        never waits on RabbitMQ and the message cannot be lost once the
+        event is committed.
+        """
+        data["created_at"] = datetime.utcnow()
+        client = self.collection.database.client
+        async with await client.start_session() as session:
+            async with session.start_transaction():
+                result = await self.collection.insert_one(data, session=session)
+                await self.outbox_service.add(
+                    routing_key=f"team.{data['team_id']}.event.{action}",
+                    message={"event": data, "action": action},
+                    # Team event shards are picked by hashing this header.
+                    headers={"team_id": str(data["team_id"])},
+                    session=session,
+                )
+        return {**data, "_id": str(result.inserted_id)}
+
+    async def update_with_notification(
+        self, event_id, update_data: dict, action: str = "updated"
+    ):
+        """Updates an event and queues its notification in one transaction.
+
+        Returns the updated event, or None if it does not exist.
+        """
+        client = self.collection.database.client
+        async with await client.start_session() as session:
+            async with session.start_transaction():
+                document = await self.collection.find_one_and_update(
+                    {"_id": ensure_object_id(event_id)},
+                    {"$set": update_data},
+                    return_document=ReturnDocument.AFTER,
+                    session=session,
+                )
+                if document is not None:
+                    await self.outbox_service.add(
+                        routing_key=f"team.{document['team_id']}.event.{action}",
+                        message={"event": document, "action": action},
+                        headers={"team_id": str(document["team_id"])},
+                        session=session,
+                    )
+        await self._invalidate(event_id)
+        if document:
+            document["_id"] = str(document["_id"])
+        return document
 
     # async def list_events(self, team_id: dict):
     #     query = {"team_id": team_id}
@@ -24,6 +78,31 @@ class EventService(MongoDBService):
     #         )
     #     return super().entity(document)
 
-    # Add event-specific methods if necessary
-    def get_upcoming_events(self):
-        return self.list({"start_date": {"$gte": datetime.utcnow()}})
+    async def calendar(
+        self,
+        team_ids: Iterable,
+        start: datetime,
+        end: Optional[datetime] = None,
+        limit: int = 50,
+        after: str = None,
+    ) -> dict:
+        """Events of several teams in [start, end), ordered by event_date.
+
+        A $in on team_id against the (team_id, event_date, _id) index lets
+        Mongo merge the per-team ranges in index order, so the whole window
+        is one sorted query with no in-memory sort, however many teams the
+        user belongs to.
+        """
+        team_ids = list({ensure_object_id(team_id) for team_id in team_ids})
+        if not team_ids:
+            return {"items": [], "next_cursor": None, "prev_cursor": None}
+
+        window = {"$gte": start}
+        if end is not None:
+            window["$lt"] = end
+        return await self.paginate(
+            {"team_id": {"$in": team_ids}, "event_date": window},
+            sort_field="event_date",
+            limit=limit,
+            after=after,
+        )
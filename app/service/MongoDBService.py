@@ -1,47 +1,209 @@
 from bson import ObjectId
-from fastapi.encoders import jsonable_encoder
 from motor.motor_asyncio import AsyncIOMotorCollection
 from datetime import datetime
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from ..config import settings
+from ..tools.Cache import build_document_cache
+from ..utils import encode_cursor, decode_cursor
+
+# Shared read-through cache for get_by_id; only collections listed in
+# settings.CACHE_TTLS are cached.
+document_cache = build_document_cache(
+    backend=settings.CACHE_BACKEND,
+    ttls=settings.CACHE_TTLS,
+    maxsize=settings.CACHE_MAXSIZE,
+    redis_url=settings.REDIS_URL,
+)
+
+
+def project(document: dict, projection: dict = None) -> dict:
+    """Applies a top-level inclusion or exclusion projection to a document."""
+    if document is None or not projection:
+        return document
+    if any(value for key, value in projection.items() if key != "_id"):
+        fields = [key for key, value in projection.items() if value]
+        if projection.get("_id", 1):
+            fields.append("_id")
+        return {key: document[key] for key in fields if key in document}
+    excluded = {key for key, value in projection.items() if not value}
+    return {key: value for key, value in document.items() if key not in excluded}
 
 
 class MongoDBService:
     def __init__(self, collection: AsyncIOMotorCollection):
         self.collection = collection
+        self.cache = (
+            document_cache
+            if document_cache and document_cache.enabled_for(collection.name)
+            else None
+        )
+
+    async def create(self, data: dict, return_document: bool = True):
+        """Creates a new document and stores it in the database asynchronously.
 
-    async def create(self, data: dict):
-        """Creates a new document and stores it in the database asynchronously."""
+        The stored document is rebuilt from data rather than read back. With
+        return_document=False only the new id is returned.
+        """
         data["created_at"] = datetime.utcnow()  # Uncomment to use timestamps
         result = await self.collection.insert_one(data)
-        return await self.get_by_id(result.inserted_id)
+        if not return_document:
+            return str(result.inserted_id)
+        return {**data, "_id": str(result.inserted_id)}
 
-    async def get_by_id(self, doc_id: str) -> dict:
-        """Retrieves a single document by its ID using an ObjectId asynchronously."""
-        document = await self.collection.find_one({"_id": ObjectId(doc_id)})
+    async def get_by_id(self, doc_id: str, projection: dict = None) -> dict:
+        """Retrieves a single document by its ID using an ObjectId asynchronously.
+
+        projection limits the fields fetched. For cached collections the
+        full document is cached and the projection is applied to it.
+        """
+        if self.cache is not None:
+            document = await self.cache.get_or_load(
+                self.collection.name, str(doc_id), lambda: self._find_by_id(doc_id)
+            )
+            return project(document, projection)
+        return await self._find_by_id(doc_id, projection)
+
+    async def _find_by_id(self, doc_id: str, projection: dict = None) -> dict:
+        document = await self.collection.find_one(
+            {"_id": ObjectId(doc_id)}, projection
+        )
         if document:
             document["_id"] = str(
                 document["_id"]
             )  # Convert ObjectId to string for JSON serialization
         return document
 
-    async def update(self, doc_id: str, update_data: dict) -> dict:
-        """Updates an existing document asynchronously."""
-        await self.collection.update_one(
-            {"_id": ObjectId(doc_id)}, {"$set": update_data}
+    async def update(
+        self,
+        doc_id: str,
+        update_data: dict,
+        return_document: bool = True,
+        projection: dict = None,
+    ):
+        """Updates an existing document asynchronously.
+
+        Returns the updated document in the same round trip, or None if it
+        does not exist. With return_document=False only whether a document
+        matched is returned.
+        """
+        if not return_document:
+            result = await self.collection.update_one(
+                {"_id": ObjectId(doc_id)}, {"$set": update_data}
+            )
+            await self._invalidate(doc_id)
+            return result.matched_count > 0
+
+        document = await self.collection.find_one_and_update(
+            {"_id": ObjectId(doc_id)},
+            {"$set": update_data},
+            projection=projection,
+            return_document=ReturnDocument.AFTER,
         )
-        return await self.get_by_id(doc_id)
+        await self._invalidate(doc_id)
+        if document:
+            document["_id"] = str(document["_id"])
+        return document
 
     async def delete(self, doc_id: str) -> bool:
         """Deletes a document by its ID asynchronously."""
         result = await self.collection.delete_one({"_id": ObjectId(doc_id)})
+        await self._invalidate(doc_id)
         return result.deleted_count > 0
 
-    async def list(self, query: dict) -> list:
+    async def list(self, query: dict, projection: dict = None) -> list:
         """Lists documents based on a query asynchronously."""
-        jsonable_encoder(query)  # Optionally process query for JSON encoding
-        cursor = self.collection.find(query)
+        cursor = self.collection.find(query, projection)
         documents = await cursor.to_list(length=None)  # Fetch all documents from cursor
         return documents
 
+    async def paginate(
+        self,
+        query: dict,
+        sort_field: str,
+        limit: int,
+        after: str = None,
+        before: str = None,
+        projection: dict = None,
+    ) -> dict:
+        """Returns one page of documents ordered by (sort_field, _id).
+
+        Uses keyset pagination: the cursors encode the sort key of the last
+        (or first) document of the page, so fetching page N costs the same as
+        fetching page 1 when there is an index on (..., sort_field).
+        Raises ValueError for a malformed cursor, or when both after and
+        before are given.
+        """
+        if after and before:
+            raise ValueError("Pass either after or before, not both")
+        direction = ASCENDING
+        if after:
+            query = {"$and": [query, self.keyset_filter(sort_field, after, "$gt")]}
+        elif before:
+            query = {"$and": [query, self.keyset_filter(sort_field, before, "$lt")]}
+            direction = DESCENDING
+
+        if projection and any(projection.values()):
+            # The cursors are built from the sort key, so it must be fetched.
+            projection = {**projection, sort_field: 1}
+        cursor = self.collection.find(query, projection).sort(
+            [(sort_field, direction), ("_id", direction)]
+        )
+        documents = await cursor.to_list(length=limit + 1)
+        has_more = len(documents) > limit
+        documents = documents[:limit]
+        if direction == DESCENDING:
+            documents.reverse()
+
+        def cursor_of(document):
+            return encode_cursor([document.get(sort_field), document["_id"]])
+
+        next_cursor = prev_cursor = None
+        if documents:
+            if has_more if direction == ASCENDING else before:
+                next_cursor = cursor_of(documents[-1])
+            if after or (before and has_more):
+                prev_cursor = cursor_of(documents[0])
+        return {
+            "items": documents,
+            "next_cursor": next_cursor,
+            "prev_cursor": prev_cursor,
+        }
+
+    @staticmethod
+    def keyset_filter(sort_field: str, cursor: str, op: str) -> dict:
+        value, last_id = decode_cursor(cursor)
+        return {
+            "$or": [
+                {sort_field: {op: value}},
+                {sort_field: value, "_id": {op: last_id}},
+            ]
+        }
+
+    async def stream(
+        self,
+        query: dict,
+        sort: list = None,
+        batch_size: int = 500,
+        projection: dict = None,
+    ):
+        """Yields documents one by one without materialising the result set."""
+        cursor = self.collection.find(query, projection).batch_size(batch_size)
+        if sort:
+            cursor = cursor.sort(sort)
+        async for document in cursor:
+            yield document
+
+    async def _invalidate(self, *doc_ids) -> None:
+        """Hook called after documents are written or deleted.
+
+        Drops them from the read-through cache. Subclasses that keep other
+        cached copies of their documents extend this.
+        """
+        if self.cache is not None:
+            await self.cache.invalidate(
+                self.collection.name, *(str(doc_id) for doc_id in doc_ids)
+            )
+
     def entity(self, document: dict) -> dict:
         """Transforms the document into a more usable entity, if necessary."""
         # This method can be overridden by subclasses to customize the transformation.
@@ -0,0 +1,130 @@
+from bson import ObjectId
+from datetime import datetime, timedelta
+from uuid import uuid4
+from .MongoDBService import MongoDBService
+from ..database import Outbox
+
+
+class OutboxService(MongoDBService):
+    """Messages waiting to be published to RabbitMQ.
+
+    Rows are written in the same transaction as the document they describe,
+    then picked up by OutboxRelay, so a broker outage delays notifications
+    instead of losing them.
+    """
+
+    PENDING = "pending"
+    PUBLISHING = "publishing"
+    SENT = "sent"
+    # Gave up after max_attempts; kept for inspection, never re-claimed.
+    DEAD = "dead"
+
+    def __init__(self):
+        super().__init__(Outbox)
+
+    async def add(
+        self, routing_key: str, message: dict, headers: dict = None, session=None
+    ) -> ObjectId:
+        """Queues a message, inside the caller's transaction if session is set."""
+        result = await self.collection.insert_one(
+            {
+                "routing_key": routing_key,
+                "message": message,
+                "headers": headers,
+                "status": self.PENDING,
+                "attempts": 0,
+                "created_at": datetime.utcnow(),
+            },
+            session=session,
+        )
+        return result.inserted_id
+
+    async def claim_batch(
+        self, limit: int, lease_seconds: int, max_attempts: int = 10
+    ) -> list:
+        """Leases up to limit unsent rows, oldest first.
+
+        Rows whose lease expired (a relay died mid-publish) are claimable
+        again, so several app replicas can run relays side by side. A row
+        whose lease expired after max_attempts claims is marked dead
+        instead, so a row that keeps crashing the relay is not retried
+        forever.
+        """
+        now = datetime.utcnow()
+        await self.collection.update_many(
+            {
+                "status": self.PUBLISHING,
+                "lease_until": {"$lt": now},
+                "attempts": {"$gte": max_attempts},
+            },
+            {
+                "$set": {"status": self.DEAD, "last_error": "lease expired"},
+                "$unset": {"claim": "", "lease_until": ""},
+            },
+        )
+        claimable = {
+            "$or": [
+                {"status": self.PENDING},
+                {"status": self.PUBLISHING, "lease_until": {"$lt": now}},
+            ]
+        }
+        cursor = (
+            self.collection.find(claimable, {"_id": 1})
+            .sort("created_at", 1)
+            .limit(limit)
+        )
+        ids = [document["_id"] async for document in cursor]
+        if not ids:
+            return []
+
+        claim = uuid4().hex
+        await self.collection.update_many(
+            {"_id": {"$in": ids}, **claimable},
+            {
+                "$set": {
+                    "status": self.PUBLISHING,
+                    "claim": claim,
+                    "lease_until": now + timedelta(seconds=lease_seconds),
+                },
+                "$inc": {"attempts": 1},
+            },
+        )
+        cursor = self.collection.find({"_id": {"$in": ids}, "claim": claim}).sort(
+            "created_at", 1
+        )
+        return await cursor.to_list(length=limit)
+
+    async def mark_sent(self, ids: list):
+        if ids:
+            await self.collection.update_many(
+                {"_id": {"$in": ids}},
+                {
+                    "$set": {"status": self.SENT, "sent_at": datetime.utcnow()},
+                    "$unset": {"claim": "", "lease_until": ""},
+                },
+            )
+
+    async def release(self, ids: list, error: str, max_attempts: int = 10):
+        """Returns rows that failed to publish to the pending state.
+
+        Rows that already used max_attempts claims are marked dead.
+        """
+        if ids:
+            await self.collection.update_many(
+                {"_id": {"$in": ids}},
+                [
+                    {
+                        "$set": {
+                            "status": {
+                                "$cond": [
+                                    {"$gte": ["$attempts", max_attempts]},
+                                    self.DEAD,
+                                    self.PENDING,
+                                ]
+                            },
+                            "last_error": error,
+                        }
+                    },
+                    {"$unset": ["claim", "lease_until"]},
+                ],
+            )
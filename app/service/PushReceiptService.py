@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+from pymongo.errors import BulkWriteError
+from .MongoDBService import MongoDBService
+from ..database import Push_Receipt
+
+
+class PushReceiptService(MongoDBService):
+    """Expo ticket ids waiting for their push receipt.
+
+    Rows are keyed by ticket id and remember the token the message went to,
+    so a DeviceNotRegistered receipt can be traced back to the push_token
+    entry. Rows expire with the receipts on Expo's side, after a day.
+    """
+
+    def __init__(self):
+        super().__init__(Push_Receipt)
+
+    async def record(self, tickets, delay_seconds: int) -> int:
+        """Stores the ids of accepted tickets, due for checking after delay."""
+        now = datetime.utcnow()
+        documents = [
+            {
+                "_id": ticket.id,
+                "token": ticket.push_message.to,
+                "created_at": now,
+                "check_after": now + timedelta(seconds=delay_seconds),
+            }
+            for ticket in tickets
+            if ticket.is_success() and ticket.id
+        ]
+        if not documents:
+            return 0
+        try:
+            await self.collection.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            # Duplicate ids from a redelivered message are already tracked.
+            return e.details["nInserted"]
+        return len(documents)
+
+    async def due(self, limit: int) -> list:
+        cursor = (
+            self.collection.find({"check_after": {"$lte": datetime.utcnow()}})
+            .sort("check_after", 1)
+            .limit(limit)
+        )
+        return await cursor.to_list(length=limit)
+
+    async def postpone(self, ticket_ids: list, delay_seconds: int):
+        """Pushes back rows whose receipt Expo has not produced yet."""
+        if ticket_ids:
+            await self.collection.update_many(
+                {"_id": {"$in": ticket_ids}},
+                {
+                    "$set": {
+                        "check_after": datetime.utcnow()
+                        + timedelta(seconds=delay_seconds)
+                    }
+                },
+            )
+
+    async def remove(self, ticket_ids: list):
+        if ticket_ids:
+            await self.collection.delete_many({"_id": {"$in": ticket_ids}})
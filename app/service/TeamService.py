@@ -4,10 +4,14 @@ from datetime import datetime
 from app.serializers.eventSerializers import eventEntity
 from .MongoDBService import MongoDBService
 from ..database import Team
+from pymongo import UpdateOne
 from pymongo.errors import PyMongoError
+from bson.errors import InvalidId
+from collections import defaultdict
 from fastapi import HTTPException, status
 from ..utils import ensure_object_id
 from .BaseService import BaseService
+from .AuthService import user_cache
 
 
 class TeamService(BaseService):
@@ -23,10 +27,6 @@ class TeamService(BaseService):
     #         )
     #     return super().entity(document)
 
-    # Add event-specific methods if necessary
-    def get_upcoming_events(self):
-        return self.list({"start_date": {"$gte": datetime.utcnow()}})
-
     async def add_users_to_teams(
         self, user_ids, team_ids, user_role_field, register=True
     ):
@@ -51,12 +51,10 @@ class TeamService(BaseService):
 
                     # Conditionally add teams to users
                     if not register:
-                        users_update_result = (
-                            await self.auth_service.collection.update_many(
-                                {"_id": {"$in": user_ids}},
-                                {"$addToSet": {"teams": {"$each": team_ids}}},
-                                session=session,
-                            )
+                        users_update_result = await self.auth_service.update_many(
+                            {"_id": {"$in": user_ids}},
+                            {"$addToSet": {"teams": {"$each": team_ids}}},
+                            session=session,
                         )
 
                     # Check results based on the value of register
@@ -83,16 +81,122 @@ class TeamService(BaseService):
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Transaction failed: {str(e)}",
             )
+        finally:
+            # Runs once the transaction has committed or aborted. A read that
+            # began before the commit may still be loading the old documents;
+            # invalidating also tells the caches not to store its result.
+            await self._invalidate(*team_ids)
+            if not register:
+                for user_id in user_ids:
+                    user_cache.invalidate(str(user_id))
+
+    async def add_memberships(self, pairs: list):
+        """Adds many (user_id, team_id) memberships in one transaction.
+
+        Roles and team existence are resolved with one $in query each, then
+        both sides of the membership are written with one bulk_write per
+        collection. Players go to team_players, everyone else to
+        team_coaches, regardless of how roles are mixed within a call.
+        """
+        if not pairs:
+            # bulk_write rejects an empty batch; this is a client error.
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No memberships to add",
+            )
+        try:
+            pairs = [
+                (ensure_object_id(user_id), ensure_object_id(team_id))
+                for user_id, team_id in pairs
+            ]
+        except InvalidId as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+        user_ids = list({user_id for user_id, _ in pairs})
+        team_ids = list({team_id for _, team_id in pairs})
+
+        roles = {
+            user["_id"]: user.get("role")
+            async for user in self.auth_service.find(
+                {"_id": {"$in": user_ids}}, {"role": 1}
+            )
+        }
+        missing_users = [str(u) for u in user_ids if u not in roles]
+        missing_teams = [str(t) for t in await self.missing_ids(team_ids)]
+        if missing_users or missing_teams:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail={"missing_users": missing_users, "missing_teams": missing_teams},
+            )
+
+        team_members = defaultdict(lambda: defaultdict(list))
+        user_teams = defaultdict(list)
+        for user_id, team_id in pairs:
+            field = "team_players" if roles[user_id] == "Player" else "team_coaches"
+            team_members[team_id][field].append(user_id)
+            user_teams[user_id].append(team_id)
+
+        team_ops = [
+            UpdateOne(
+                {"_id": team_id},
+                {
+                    "$addToSet": {
+                        field: {"$each": members} for field, members in fields.items()
+                    }
+                },
+            )
+            for team_id, fields in team_members.items()
+        ]
+        user_ops = [
+            UpdateOne({"_id": user_id}, {"$addToSet": {"teams": {"$each": teams}}})
+            for user_id, teams in user_teams.items()
+        ]
+
+        client = self.collection.database.client
+        try:
+            async with await client.start_session() as session:
+                async with session.start_transaction():
+                    teams_result = await self.collection.bulk_write(
+                        team_ops, ordered=False, session=session
+                    )
+                    users_result = await self.auth_service.bulk_write(
+                        user_ops, ordered=False, session=session
+                    )
+        except PyMongoError as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Transaction failed: {str(e)}",
+            )
+        finally:
+            await self._invalidate(*team_ids)
+            for user_id in user_ids:
+                user_cache.invalidate(str(user_id))
+
+        return {
+            "status": "success",
+            "memberships": len(pairs),
+            "modified_count_teams": teams_result.modified_count,
+            "modified_count_users": users_result.modified_count,
+        }
 
     async def team_users_list(self, team_id: str):
-        team = await self.get_by_id(team_id)
+        team = await self.get_by_id(team_id, projection={"team_players": 1})
         players = team["team_players"]
         return players
 
+    async def existing_ids(self, team_ids) -> set:
+        """Returns which of team_ids exist, using one $in query on _id only."""
+        team_ids = [ensure_object_id(team_id) for team_id in team_ids]
+        if not team_ids:
+            return set()
+        cursor = self.collection.find({"_id": {"$in": team_ids}}, {"_id": 1})
+        return {team["_id"] async for team in cursor}
+
+    async def missing_ids(self, team_ids) -> list:
+        """Returns the team_ids that do not exist, in their original order."""
+        team_ids = [ensure_object_id(team_id) for team_id in team_ids]
+        existing = await self.existing_ids(team_ids)
+        return [team_id for team_id in team_ids if team_id not in existing]
+
     async def check_team_exists(self, team_id):
-        team_id = ensure_object_id(team_id)
-        team = await self.get_by_id(team_id)
-        if team:
-            return True
-        else:
-            return False
+        return not await self.missing_ids([team_id])
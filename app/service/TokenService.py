@@ -1,49 +1,171 @@
 from bson import ObjectId
 from pymongo.collection import Collection
 from app.serializers.eventSerializers import eventEntity
-from .MongoDBService import MongoDBService
+from .BaseService import BaseService
 from ..models.firebase_token_schemas import PushTokenSchema
 from ..database import Push_Token
+from ..utils import ensure_object_id
+from ..config import settings
 
 
-class PushTokenService(MongoDBService):
+class PushTokenService(BaseService):
+    # device_id given to a token stored before devices were tracked.
+    LEGACY_DEVICE_ID = "legacy"
+
     def __init__(self):
         super().__init__(Push_Token)
 
     async def save_token(self, payload: PushTokenSchema, user_id: str):
-        data = payload.dict()
-        token = await self.get_by_id(user_id)
-        if token:
-            res = await self.update(user_id, {"token": payload.token})
-            return res
-        data["_id"] = ObjectId(user_id)
-        result = await self.create(data)
-        return result
+        """Registers a device's token for the user in one atomic upsert.
+
+        The pipeline replaces any entry for the same device or token, then
+        appends the new one, keeping the most recent PUSH_MAX_DEVICES.
+        A legacy single token field is folded into devices on the way.
+        """
+        user_id = ensure_object_id(user_id)
+        # Client strings go through $literal so a leading "$" is not a path.
+        device_id = {"$literal": payload.device_id}
+        token = {"$literal": payload.token}
+        device = {"device_id": device_id, "token": token, "last_seen": "$$NOW"}
+        legacy = {
+            "$cond": [
+                {"$eq": [{"$type": "$token"}, "string"]},
+                [{"device_id": self.LEGACY_DEVICE_ID, "token": "$token"}],
+                [],
+            ]
+        }
+        others = {
+            "$filter": {
+                "input": {"$ifNull": ["$devices", legacy]},
+                "cond": {
+                    "$and": [
+                        {"$ne": ["$$this.device_id", device_id]},
+                        {"$ne": ["$$this.token", token]},
+                    ]
+                },
+            }
+        }
+        result = await self.collection.update_one(
+            {"_id": user_id},
+            [
+                {
+                    "$set": {
+                        "devices": {
+                            "$slice": [
+                                {"$concatArrays": [others, [device]]},
+                                -settings.PUSH_MAX_DEVICES,
+                            ]
+                        }
+                    }
+                },
+                {"$unset": "token"},
+            ],
+            upsert=True,
+        )
+        await self._invalidate(user_id)
+        return result.acknowledged
 
     async def get_team_player_tokens(self, team_id):
-        try:
-            team = await team_service.get_by_id(ObjectId(team_id))
-
-            if team:
-                players_ids = team["team_players"]
-                object_ids = [ObjectId(id) for id in players_ids]
-                query = {"_id": {"$in": object_ids}}
-                documents = await self.list(query=query)
-                # Extract tokens, ensuring each player has a token attribute
-                tokens = [player["token"] for player in documents if "token" in player]
-
-                return tokens
-            else:
-                return {"team not found"}
-        except Exception as e:
-            # Handle possible exceptions
-            print(f"An error occurred: {e}")
-            return []
-        except KeyError as e:
-            # Handle cases where expected keys are missing in the data
-            print(f"Key error: {e} - Check data integrity")
-            return []
-        except Exception as e:
-            # Generic exception handling to catch unexpected errors
-            print(f"An error occurred: {e}")
-            return []
+        return await self.get_teams_player_tokens([team_id])
+
+    async def get_teams_player_tokens(
+        self, team_ids, roles=("team_players", "team_coaches")
+    ):
+        """Resolves teams to the distinct push tokens of their members.
+
+        A single aggregation on the teams collection unions the member
+        arrays, joins them against push_token and returns only the token
+        strings, so fan-out costs one round trip however many teams an
+        event targets.
+        """
+        team_ids = [ensure_object_id(team_id) for team_id in team_ids]
+        pipeline = [
+            {"$match": {"_id": {"$in": team_ids}}},
+            {
+                "$project": {
+                    "_id": 0,
+                    "members": {
+                        "$setUnion": [{"$ifNull": [f"${role}", []]} for role in roles]
+                    },
+                }
+            },
+            {"$unwind": "$members"},
+            # Members are stored either as ObjectIds or as their hex strings.
+            {
+                "$group": {
+                    "_id": {
+                        "$convert": {
+                            "input": "$members",
+                            "to": "objectId",
+                            "onError": "$members",
+                        }
+                    }
+                }
+            },
+            {
+                "$lookup": {
+                    "from": self.collection.name,
+                    "localField": "_id",
+                    "foreignField": "_id",
+                    "as": "push",
+                }
+            },
+            {"$unwind": "$push"},
+            # Tokens of every device, plus the legacy field of users who
+            # have not re-registered since devices were introduced.
+            {
+                "$project": {
+                    "tokens": {
+                        "$concatArrays": [
+                            {"$ifNull": ["$push.devices.token", []]},
+                            {
+                                "$cond": [
+                                    {"$eq": [{"$type": "$push.token"}, "string"]},
+                                    ["$push.token"],
+                                    [],
+                                ]
+                            },
+                        ]
+                    }
+                }
+            },
+            {"$unwind": "$tokens"},
+            # A device shared by several members gets one notification.
+            {"$group": {"_id": "$tokens"}},
+            {"$match": {"_id": {"$type": "string"}}},
+        ]
+        cursor = self.get_collection("team").aggregate(pipeline)
+        return [document["_id"] async for document in cursor]
+
+    async def prune_tokens(self, tokens) -> int:
+        """Removes tokens Expo no longer delivers to from every user."""
+        tokens = list(set(tokens))
+        if not tokens:
+            return 0
+        query = {
+            "$or": [{"devices.token": {"$in": tokens}}, {"token": {"$in": tokens}}]
+        }
+        cursor = self.collection.find(query, {"_id": 1})
+        doc_ids = [document["_id"] async for document in cursor]
+        if not doc_ids:
+            return 0
+        result = await self.collection.update_many(
+            {"_id": {"$in": doc_ids}},
+            [
+                {
+                    "$set": {
+                        "devices": {
+                            "$filter": {
+                                "input": {"$ifNull": ["$devices", []]},
+                                "cond": {"$not": [{"$in": ["$$this.token", tokens]}]},
+                            }
+                        },
+                        "token": {
+                            "$cond": [{"$in": ["$token", tokens]}, "$$REMOVE", "$token"]
+                        },
+                    }
+                }
+            ],
+        )
+        await self._invalidate(*doc_ids)
+        return result.modified_count
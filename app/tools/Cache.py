@@ -0,0 +1,158 @@
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import copy
+import bson
+from .LRUCache import LRUCache
+
+
+class MemoryCacheBackend:
+    """In-process backend on top of LRUCache.
+
+    Values are deep-copied on the way in and out, so a caller changing a
+    nested field (a document's teams list, say) cannot change the entry.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self.lru = LRUCache(maxsize=maxsize)
+
+    async def get(self, key: str) -> Optional[dict]:
+        value = self.lru.get(key)
+        return copy.deepcopy(value) if value is not None else None
+
+    async def set(self, key: str, value: dict, ttl: Optional[int] = None):
+        self.lru.set(key, copy.deepcopy(value), ttl=ttl)
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self.lru.invalidate(key)
+
+    def stats(self) -> dict:
+        return self.lru.stats()
+
+
+class RedisCacheBackend:
+    """Backend for any Redis-compatible asyncio client.
+
+    Only get(key), set(key, value, ex=ttl) and delete(*keys) are used, so a
+    local fake with those three coroutines can stand in for Redis in tests.
+    Documents are stored as BSON to keep ObjectId and datetime values intact.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisCacheBackend":
+        import redis.asyncio as redis
+
+        return cls(redis.from_url(url))
+
+    async def get(self, key: str) -> Optional[dict]:
+        raw = await self.client.get(key)
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return bson.decode(raw)
+
+    async def set(self, key: str, value: dict, ttl: Optional[int] = None):
+        await self.client.set(key, bson.encode(value), ex=ttl)
+
+    async def delete(self, *keys: str):
+        if keys:
+            await self.client.delete(*keys)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+class ReadThroughCache:
+    """Read-through document cache with per-namespace TTLs.
+
+    Concurrent misses for the same key share one load (single flight), so
+    a hot document that expires causes one database read rather than one
+    per waiting request. invalidate() detaches a load that is in flight:
+    it may have read the document before the write, so its result is
+    handed to the callers already waiting but not stored.
+
+    :ivar backend: MemoryCacheBackend, RedisCacheBackend or a compatible fake.
+    :ivar ttls: Seconds to keep entries, per namespace (collection name).
+    """
+
+    def __init__(self, backend, ttls: Dict[str, int]):
+        self.backend = backend
+        self.ttls = ttls
+        self._loading: Dict[str, asyncio.Future] = {}
+        self.loads = 0
+        self.coalesced = 0
+
+    def enabled_for(self, namespace: str) -> bool:
+        return namespace in self.ttls
+
+    @staticmethod
+    def key(namespace: str, doc_id: Any) -> str:
+        return f"{namespace}:{doc_id}"
+
+    async def get_or_load(
+        self,
+        namespace: str,
+        doc_id: Any,
+        loader: Callable[[], Awaitable[Optional[dict]]],
+    ) -> Optional[dict]:
+        key = self.key(namespace, doc_id)
+        value = await self.backend.get(key)
+        if value is not None:
+            return value
+
+        pending = self._loading.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            value = await asyncio.shield(pending)
+            return copy.deepcopy(value) if value is not None else None
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            self.loads += 1
+            value = await loader()
+            # Only store the value if no invalidate() ran during the load.
+            if value is not None and self._loading.get(key) is future:
+                await self.backend.set(key, value, ttl=self.ttls.get(namespace))
+            future.set_result(value)
+        except BaseException as e:
+            future.set_exception(e)
+            # Nobody may be waiting; mark the exception as retrieved.
+            future.exception()
+            raise
+        finally:
+            if self._loading.get(key) is future:
+                del self._loading[key]
+        return copy.deepcopy(value) if value is not None else None
+
+    async def invalidate(self, namespace: str, *doc_ids: Any):
+        keys = [self.key(namespace, doc_id) for doc_id in doc_ids]
+        for key in keys:
+            # Later misses start a fresh load instead of joining this one.
+            self._loading.pop(key, None)
+        await self.backend.delete(*keys)
+
+    def stats(self) -> dict:
+        return {
+            "loads": self.loads,
+            "coalesced": self.coalesced,
+            **self.backend.stats(),
+        }
+
+
+def build_document_cache(
+    backend: str, ttls: Dict[str, int], maxsize: int, redis_url: str
+) -> Optional[ReadThroughCache]:
+    if backend == "memory":
+        return ReadThroughCache(MemoryCacheBackend(maxsize=maxsize), ttls)
+    if backend == "redis":
+        return ReadThroughCache(RedisCacheBackend.from_url(redis_url), ttls)
+    if backend == "none":
+        return None
+    raise ValueError(f"Unknown cache backend: {backend}")
@@ -1,6 +1,9 @@
 from collections import namedtuple
+import asyncio
+import gzip
 import json
 import itertools
+import httpx
 import requests
 
 
@@ -328,14 +331,18 @@ class PushClient(object):
 
         self.session = session
         if not self.session:
-            self.session = requests.Session()
-            self.session.headers.update(
-                {
-                    "accept": "application/json",
-                    "accept-encoding": "gzip, deflate",
-                    "content-type": "application/json",
-                }
-            )
+            self.session = self._default_session()
+
+    def _default_session(self):
+        session = requests.Session()
+        session.headers.update(
+            {
+                "accept": "application/json",
+                "accept-encoding": "gzip, deflate",
+                "content-type": "application/json",
+            }
+        )
+        return session
 
     @classmethod
     def is_exponent_push_token(cls, token):
@@ -369,7 +376,12 @@ class PushClient(object):
             data=json.dumps([pm.get_payload() for pm in push_messages]),
             timeout=self.timeout,
         )
+        return self.validate_and_get_tickets(push_messages, response)
 
+    def validate_and_get_tickets(self, push_messages, response):
+        """
+        Validate a /push/send response and pair each ticket with its message
+        """
         # Let's validate the response format first.
         try:
             response_data = response.json()
@@ -377,7 +389,6 @@ class PushClient(object):
             # The response isn't json. First, let's attempt to raise a normal
             # http error. If it's a 200, then we'll raise our own error.
             response.raise_for_status()
-
             raise PushServerError("Invalid server response", response)
 
         # If there are errors with the entire request, raise an error now.
@@ -395,11 +406,37 @@ class PushClient(object):
                 "Invalid server response", response, response_data=response_data
             )
 
-        # Use the requests library's built-in exceptions for any remaining 4xx
-        # and 5xx errors.
+        # Sanity check the response
+        if len(push_messages) != len(response_data["data"]):
+            raise PushServerError(
+                (
+                    "Mismatched response length. Expected %d %s but only "
+                    "received %d"
+                    % (
+                        len(push_messages),
+                        "receipt" if len(push_messages) == 1 else "receipts",
+                        len(response_data["data"]),
+                    )
+                ),
+                response,
+                response_data=response_data,
+            )
+
+        # Any remaining 4xx and 5xx errors.
         response.raise_for_status()
 
-        return "DUMMY RETURN"
+        # At this point, we know it's a 200 and the response format is correct.
+        # Now let's parse the responses per push notification.
+        return [
+            PushTicket(
+                push_message=push_messages[i],
+                status=ticket.get("status", PushTicket.ERROR_STATUS),
+                message=ticket.get("message", ""),
+                details=ticket.get("details", None),
+                id=ticket.get("id", ""),
+            )
+            for i, ticket in enumerate(response_data["data"])
+        ]
 
     def publish(self, push_message):
         """Sends a single push notification
@@ -524,4 +561,235 @@ class PushClient(object):
         return ret
 
 
+class AsyncPushClient(PushClient):
+    """Asyncio Exponent push client
+
+    Same API as PushClient, but every call is a coroutine so publishing from
+    the RabbitMQ consumer no longer blocks the event loop. Requests go through
+    a shared keep-alive connection pool and chunks are sent concurrently, up
+    to max_concurrency requests in flight at once.
+    """
+
+    DEFAULT_MAX_CONCURRENCY = 6
+    DEFAULT_MAX_CONNECTIONS = 10
+    # Seconds; a stalled connection must not hold a slot forever.
+    DEFAULT_TIMEOUT = 10.0
+    # Expo rejects notifications whose payload is over 4 KB.
+    MAX_PAYLOAD_BYTES = 4096
+
+    def __init__(self, host=None, api_url=None, session=None, **kwargs):
+        """Construct a new AsyncPushClient object.
+
+        Args:
+            host: The server protocol, hostname, and port. Point this at a
+                local stub server in tests.
+            api_url: The api url at the host.
+            session: Pass in your own httpx.AsyncClient object if you prefer
+                to customize. It is created lazily otherwise.
+            max_concurrency: Maximum number of chunks sent at the same time.
+            max_connections: Size of the keep-alive connection pool.
+            gzip: Compress request bodies with gzip. Defaults to True.
+            timeout: Seconds or an httpx.Timeout. Defaults to 10 seconds.
+        """
+        super().__init__(host=host, api_url=api_url, session=session, **kwargs)
+        if self.timeout is None:
+            self.timeout = httpx.Timeout(AsyncPushClient.DEFAULT_TIMEOUT)
+        self.max_concurrency = kwargs.get(
+            "max_concurrency", AsyncPushClient.DEFAULT_MAX_CONCURRENCY
+        )
+        self.max_connections = kwargs.get(
+            "max_connections", AsyncPushClient.DEFAULT_MAX_CONNECTIONS
+        )
+        self.gzip = kwargs.get("gzip", True)
+        self._semaphore = None
+
+    def _default_session(self):
+        return None
+
+    def _get_session(self):
+        # The pool is bound to the running loop, so build it on first use
+        # instead of at import time.
+        if self.session is None or self.session.is_closed:
+            self.session = httpx.AsyncClient(
+                headers={
+                    "accept": "application/json",
+                    "accept-encoding": "gzip, deflate",
+                    "content-type": "application/json",
+                },
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                timeout=self.timeout,
+            )
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self.session
+
+    async def _post(self, path, payload):
+        return await self._post_body(path, json.dumps(payload).encode())
+
+    async def _post_body(self, path, body):
+        session = self._get_session()
+        headers = {}
+        if self.gzip:
+            body = gzip.compress(body)
+            headers["content-encoding"] = "gzip"
+
+        async with self._semaphore:
+            return await session.post(
+                self.host + self.api_url + path, content=body, headers=headers
+            )
+
+    async def _publish_internal(self, push_messages):
+        """Send one chunk of push notifications
+
+        Messages over the payload limit are not sent; they get a
+        MessageTooBig ticket in their place and the rest of the chunk goes
+        out as usual.
+
+        Args:
+            push_messages: An array of PushMessage objects.
+        """
+        body, sendable, tickets = self.encode_messages(push_messages)
+        if sendable:
+            response = await self._post_body("/push/send", body)
+            sent = iter(self.validate_and_get_tickets(sendable, response))
+            tickets = [next(sent) if t is None else t for t in tickets]
+        return tickets
+
+    def encode_messages(self, push_messages):
+        """Serialises a chunk for /push/send, checking the payload limit.
+
+        Each message is checked on its own. One over MAX_PAYLOAD_BYTES is
+        left out of the body and gets an error ticket with details
+        {"error": "MessageTooBig"}, as Expo would have answered, so a
+        single oversize message does not fail the whole chunk.
+
+        When the remaining messages differ only in `to`, as for a team
+        broadcast, they are sent as one message with an array of
+        recipients and the shared part is serialised once. Expo still
+        answers with one ticket per recipient, in order.
+
+        Returns:
+            (body, sendable, tickets): the request body, or None when no
+            message can be sent; the messages in it; and a list parallel to
+            push_messages holding the error ticket of each oversize message
+            and None for the others.
+        """
+        tickets, sendable, contents = [], [], []
+        for message in push_messages:
+            content = self._encode_content(message)
+            if len(content) > self.MAX_PAYLOAD_BYTES:
+                tickets.append(self._too_big_ticket(message, len(content)))
+            else:
+                tickets.append(None)
+                sendable.append(message)
+                contents.append(content)
+        if not sendable:
+            return None, sendable, tickets
+
+        first = sendable[0]
+        # `to` is the first field, so the rest of the tuple is the content.
+        if all(message[1:] == first[1:] for message in sendable[1:]):
+            recipients = [message.to for message in sendable]
+            to = recipients if len(recipients) > 1 else first.to
+            return b"[" + self._with_to(to, contents[0]) + b"]", sendable, tickets
+        body = b",".join(
+            self._with_to(message.to, content)
+            for message, content in zip(sendable, contents)
+        )
+        return b"[" + body + b"]", sendable, tickets
+
+    @staticmethod
+    def _encode_content(push_message):
+        # Everything but `to`, which is what the size limit applies to.
+        payload = push_message.get_payload()
+        del payload["to"]
+        return json.dumps(
+            payload, ensure_ascii=False, separators=(",", ":")
+        ).encode()
+
+    @staticmethod
+    def _with_to(to, content):
+        head = b'{"to":' + json.dumps(to, separators=(",", ":")).encode()
+        return head + (b"," + content[1:] if content != b"{}" else b"}")
+
+    def _too_big_ticket(self, push_message, size):
+        return PushTicket(
+            push_message=push_message,
+            status=PushTicket.ERROR_STATUS,
+            message=(
+                f"Payload is {size} bytes, "
+                f"over the {self.MAX_PAYLOAD_BYTES} byte limit"
+            ),
+            details={"error": PushTicket.ERROR_MESSAGE_TOO_BIG},
+            id="",
+        )
+
+    async def publish(self, push_message):
+        """Sends a single push notification
+
+        Args:
+            push_message: A single PushMessage object.
+
+        Returns:
+           A PushTicket object which contains the results.
+        """
+        return (await self.publish_multiple([push_message]))[0]
+
+    async def publish_multiple(self, push_messages):
+        """Sends multiple push notifications, one request per chunk
+
+        Args:
+            push_messages: An array of PushMessage objects.
+
+        Returns:
+           An array of PushTicket objects which contains the results, in the
+           same order as push_messages.
+        """
+        chunks = [
+            push_messages[start : start + self.max_message_count]
+            for start in range(0, len(push_messages), self.max_message_count)
+        ]
+        results = await asyncio.gather(
+            *(self._publish_internal(chunk) for chunk in chunks)
+        )
+        return [ticket for tickets in results for ticket in tickets]
+
+    async def check_receipts_multiple(self, push_tickets):
+        """
+        Check receipts in batches of 1000 as per expo docs
+        """
+        chunks = [
+            push_tickets[start : start + self.max_receipt_count]
+            for start in range(0, len(push_tickets), self.max_receipt_count)
+        ]
+        results = await asyncio.gather(
+            *(self._check_receipts_internal(chunk) for chunk in chunks)
+        )
+        return [receipt for receipts in results for receipt in receipts]
+
+    async def _check_receipts_internal(self, push_tickets):
+        """
+        Helper function for check_receipts_multiple
+        """
+        response = await self._post(
+            "/push/getReceipts",
+            {"ids": [push_ticket.id for push_ticket in push_tickets]},
+        )
+        return self.validate_and_get_receipts(response)
+
+    async def check_receipts(self, push_tickets):
+        """Checks the push receipts of the given push tickets"""
+        return await self._check_receipts_internal(push_tickets)
+
+    async def aclose(self):
+        """Close the pooled connections."""
+        if self.session is not None:
+            await self.session.aclose()
+            self.session = None
+
+
 push_client = PushClient()
+async_push_client = AsyncPushClient()
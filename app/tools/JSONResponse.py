@@ -0,0 +1,15 @@
+from typing import Any
+from fastapi.responses import ORJSONResponse
+from .MessageCodec import encode_body
+
+
+class MongoJSONResponse(ORJSONResponse):
+    """orjson response that also serialises Mongo documents as they come.
+
+    datetime is handled natively by orjson and ObjectId falls back to str,
+    so handlers can return raw documents. Returning an instance directly
+    from a handler skips FastAPI's jsonable_encoder pass entirely.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return encode_body(content)
@@ -0,0 +1,101 @@
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+import time
+
+
+class LRUCache:
+    """Bounded in-process LRU cache with per-entry expiry.
+
+    Entries are evicted least-recently-used first once maxsize is reached,
+    and are dropped lazily on read once their TTL has passed. Hit and miss
+    counters are kept so the cache can be sized from live traffic.
+
+    Callers that fill the cache from a slower source wrap the read in
+    begin_load/end_load: an invalidate() that lands while the read is in
+    flight makes end_load discard the (possibly stale) value.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # key -> [loads in flight, invalidation generation]
+        self._loads: dict = {}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def begin_load(self, key: Hashable) -> int:
+        """Marks a load of key as in flight and returns its generation."""
+        entry = self._loads.setdefault(key, [0, 0])
+        entry[0] += 1
+        return entry[1]
+
+    def end_load(
+        self,
+        key: Hashable,
+        generation: int,
+        value: Any = None,
+        ttl: Optional[float] = None,
+    ) -> bool:
+        """Finishes a load; caches value unless key was invalidated meanwhile.
+
+        Must be called for every begin_load, also when the load failed.
+        Returns whether the value is still current.
+        """
+        entry = self._loads[key]
+        entry[0] -= 1
+        current = entry[1] == generation
+        if not entry[0]:
+            del self._loads[key]
+        if current and value is not None:
+            self.set(key, value, ttl)
+        return current
+
+    def invalidate(self, key: Hashable) -> bool:
+        entry = self._loads.get(key)
+        if entry is not None:
+            entry[1] += 1
+        return self._data.pop(key, None) is not None
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,35 @@
+from datetime import date, datetime
+from typing import Any
+from bson import ObjectId
+import msgpack
+import orjson
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+
+
+def _default(obj: Any):
+    # orjson serialises datetime natively; msgpack needs it spelled out.
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    return str(obj)
+
+
+def encode_body(message: Any, content_type: str = JSON) -> bytes:
+    """Serialises a message body compactly for the given content type."""
+    if content_type == MSGPACK:
+        return msgpack.packb(message, default=_default, use_bin_type=True)
+    if content_type == JSON:
+        return orjson.dumps(message, default=_default)
+    raise ValueError(f"Unsupported content type: {content_type}")
+
+
+def decode_body(body: bytes, content_type: str = None) -> Any:
+    """Reverses encode_body. Messages without a content type are JSON."""
+    if content_type == MSGPACK:
+        return msgpack.unpackb(body, raw=False)
+    if content_type in (None, "", JSON):
+        return orjson.loads(body)
+    raise ValueError(f"Unsupported content type: {content_type}")
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from aio_pika import IncomingMessage
+
+
+class _Burst:
+    __slots__ = ("messages", "data", "first", "deadline", "task")
+
+    def __init__(self, now: float):
+        self.messages: List[IncomingMessage] = []
+        self.data: Any = None
+        self.first = now
+        self.deadline = now
+        self.task: Optional[asyncio.Task] = None
+
+
+class NotificationCoalescer:
+    """Collapses bursts of messages about the same thing into one flush.
+
+    Messages are held unacked per key. Each new message pushes the flush
+    back by `window` seconds, but never past `max_wait` after the first
+    one, so a stream of edits still notifies regularly. The flush runs
+    with the latest message's data and then acks (or rejects) every
+    message of the burst together.
+
+    :ivar flush: Coroutine called with the data of the last message.
+    :ivar window: Debounce window in seconds.
+    :ivar max_wait: Upper bound on how long a burst is held.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[Any], Awaitable[Any]],
+        window: float = 5.0,
+        max_wait: float = 30.0,
+    ):
+        self.flush = flush
+        self.window = window
+        self.max_wait = max_wait
+        self._pending: Dict[Any, _Burst] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.flushed = 0
+        self.pushes_saved = 0
+
+    def submit(self, key: Any, message: IncomingMessage, data: Any):
+        now = asyncio.get_running_loop().time()
+        burst = self._pending.get(key)
+        if burst is None:
+            burst = self._pending[key] = _Burst(now)
+            burst.task = asyncio.create_task(self._wait_and_flush(key))
+            self._tasks.add(burst.task)
+            burst.task.add_done_callback(self._tasks.discard)
+        else:
+            self.pushes_saved += 1
+        burst.messages.append(message)
+        burst.data = data
+        burst.deadline = min(now + self.window, burst.first + self.max_wait)
+
+    async def _wait_and_flush(self, key: Any):
+        loop = asyncio.get_running_loop()
+        while True:
+            delay = self._pending[key].deadline - loop.time()
+            if delay <= 0:
+                break
+            await asyncio.sleep(delay)
+        await self._flush(key)
+
+    async def _flush(self, key: Any):
+        # Popped before the first await: a key still in _pending always
+        # belongs to a task that is only sleeping and safe to cancel.
+        burst = self._pending.pop(key, None)
+        if burst is None:
+            return
+        try:
+            await self.flush(burst.data)
+        except Exception as e:
+            logging.error(f"Failed to process message burst {key}: {e}")
+            for message in burst.messages:
+                await message.reject(requeue=False)
+            return
+        self.flushed += 1
+        for message in burst.messages:
+            await message.ack()
+
+    async def drain(self):
+        """Flushes every held burst now; used on shutdown."""
+        keys = list(self._pending)
+        for key in keys:
+            self._pending[key].task.cancel()
+        await asyncio.gather(*(self._flush(key) for key in keys))
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "flushed": self.flushed,
+            "pushes_saved": self.pushes_saved,
+        }
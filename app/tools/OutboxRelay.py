@@ -0,0 +1,108 @@
+import asyncio
+import logging
+from typing import Optional
+from ..service.OutboxService import OutboxService
+
+
+class OutboxRelay:
+    """Background task that publishes outbox rows to RabbitMQ.
+
+    Rows are claimed in batches, published concurrently over the client's
+    confirm-mode channel and marked sent once the broker has acknowledged
+    them. Failed rows go back to pending and are retried on the next pass.
+
+    :ivar rabbit_client: Connected RabbitClient used for publishing.
+    :ivar outbox_service: Storage for the outbox rows.
+    :ivar batch_size: Maximum rows claimed per pass.
+    :ivar poll_interval: Seconds to sleep when the outbox is empty.
+    :ivar lease_seconds: How long a claim is held before others may retry it.
+    :ivar max_attempts: Claims after which a row is marked dead.
+    """
+
+    def __init__(
+        self,
+        rabbit_client,
+        outbox_service: OutboxService,
+        batch_size: int = 100,
+        poll_interval: float = 1.0,
+        lease_seconds: int = 30,
+        max_attempts: int = 10,
+    ):
+        self.rabbit_client = rabbit_client
+        self.outbox_service = outbox_service
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.published = 0
+        self.failed = 0
+
+    def notify(self):
+        """Wake the relay right away instead of waiting for the next poll."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def start(self):
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                published = await self.relay_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Outbox relay pass failed: {e}")
+                published = 0
+
+            # A full batch means there is probably more waiting.
+            if published < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    async def relay_once(self) -> int:
+        """Publishes one batch and returns the number of rows claimed."""
+        rows = await self.outbox_service.claim_batch(
+            self.batch_size, self.lease_seconds, self.max_attempts
+        )
+        if not rows:
+            return 0
+
+        results = await self.rabbit_client.publish_many(
+            [(row["routing_key"], row["message"], row.get("headers")) for row in rows]
+        )
+
+        sent, failed, error = [], [], None
+        for row, result in zip(rows, results):
+            if result is not None:
+                failed.append(row["_id"])
+                error = repr(result)
+            else:
+                sent.append(row["_id"])
+
+        await self.outbox_service.mark_sent(sent)
+        await self.outbox_service.release(failed, error, self.max_attempts)
+        self.published += len(sent)
+        self.failed += len(failed)
+        if failed:
+            logging.error(f"Outbox relay failed to publish {len(failed)} rows: {error}")
+        return len(rows)
+
+    def stats(self) -> dict:
+        return {"published": self.published, "failed": self.failed}
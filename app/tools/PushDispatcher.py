@@ -0,0 +1,234 @@
+import asyncio
+import logging
+import random
+from typing import List, Optional, Set
+import aio_pika
+import httpx
+from aio_pika import IncomingMessage
+from .ExponentServerSDK import PushMessage, PushServerError, PushTicket
+from .MessageCodec import decode_body
+from .TokenBucket import TokenBucket
+
+
+class PushDispatcher:
+    """Sends push messages to Expo within its rate limit and retries failures.
+
+    Chunks pass a token bucket sized to Expo's limit (600 notifications per
+    second per project) before they are sent. A chunk that fails with 429,
+    a 5xx or a network error, and single messages rejected with
+    MessageRateExceeded, are not retried in process. They are published to
+    a delay queue whose TTL is the backoff for that attempt; on expiry the
+    broker dead-letters them to push.dispatch, which this dispatcher
+    consumes. Delays double per attempt. Each attempt has jitter_tiers
+    delay queues spread between half and all of that delay, and a retry
+    picks one at random: the broker only expires messages at the head of a
+    queue, so the jitter has to be in the queue TTL, not per message, to
+    spread a burst of retries out. Messages that run out
+    of attempts, or fail in a way a retry cannot fix, are parked in
+    push.dead for inspection.
+
+    :ivar rabbit_client: Connected RabbitClient used for the retry topology.
+    :ivar push_client: AsyncPushClient that talks to Expo.
+    :ivar receipt_reconciler: Told about every ticket Expo returns.
+    :ivar max_attempts: Retries before a message is parked.
+    :ivar base_delay: Seconds before the first retry.
+    :ivar jitter_tiers: Delay queues per attempt.
+    """
+
+    DISPATCH_QUEUE = "push.dispatch"
+    DEAD_QUEUE = "push.dead"
+
+    def __init__(
+        self,
+        rabbit_client,
+        push_client,
+        receipt_reconciler=None,
+        rate: float = 600,
+        burst: Optional[float] = None,
+        max_attempts: int = 5,
+        base_delay: float = 2.0,
+        jitter_tiers: int = 4,
+    ):
+        self.rabbit_client = rabbit_client
+        self.push_client = push_client
+        self.receipt_reconciler = receipt_reconciler
+        self.bucket = TokenBucket(rate, burst)
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.jitter_tiers = jitter_tiers
+        self.exchange_name = f"{rabbit_client.exchange_name}.push"
+        self.sent = 0
+        self.retried = 0
+        self.parked = 0
+        self._in_flight: Set[asyncio.Task] = set()
+
+    def _delay_ms(self, attempt: int, tier: int) -> int:
+        # Tier t of n waits (n + t + 1) / 2n of the full delay, so the
+        # tiers of one attempt cover (1/2, 1] of it.
+        share = (self.jitter_tiers + tier + 1) / (2 * self.jitter_tiers)
+        return int(self.base_delay * 2**attempt * share * 1000)
+
+    def _retry_routing_key(self, attempt: int) -> str:
+        tier = random.randrange(self.jitter_tiers)
+        return f"retry.{self._delay_ms(attempt, tier)}ms"
+
+    async def start(self):
+        """Declares the retry topology and consumes messages due for retry."""
+        channel = self.rabbit_client.channel
+        exchange = await channel.declare_exchange(
+            self.exchange_name, aio_pika.ExchangeType.DIRECT, durable=True
+        )
+        dispatch = await channel.declare_queue(
+            self.DISPATCH_QUEUE,
+            durable=True,
+            arguments={
+                "x-dead-letter-exchange": self.exchange_name,
+                "x-dead-letter-routing-key": "dead",
+            },
+        )
+        await dispatch.bind(exchange, routing_key="dispatch")
+        dead = await channel.declare_queue(self.DEAD_QUEUE, durable=True)
+        await dead.bind(exchange, routing_key="dead")
+
+        for attempt in range(self.max_attempts):
+            for tier in range(self.jitter_tiers):
+                # The delay is part of the name: queue arguments cannot
+                # change once declared, so a new base_delay gets new queues.
+                delay_ms = self._delay_ms(attempt, tier)
+                queue = await channel.declare_queue(
+                    f"push.retry.{delay_ms}ms",
+                    durable=True,
+                    arguments={
+                        "x-message-ttl": delay_ms,
+                        "x-dead-letter-exchange": self.exchange_name,
+                        "x-dead-letter-routing-key": "dispatch",
+                    },
+                )
+                await queue.bind(exchange, routing_key=f"retry.{delay_ms}ms")
+
+        self.rabbit_client.push_dispatcher = self
+        await self.rabbit_client.start_consumer(
+            self.DISPATCH_QUEUE, handler=self._on_retry
+        )
+
+    async def stop(self):
+        """Stops consuming retries, then waits for sends in flight.
+
+        Call before RabbitClient.stop: a send that is still running needs
+        the connection to publish its retries and to ack its message.
+        Waits at most the RabbitClient's drain_timeout.
+        """
+        await self.rabbit_client.cancel_consumer(self.DISPATCH_QUEUE)
+        if self._in_flight:
+            logging.info(f"Waiting for {len(self._in_flight)} push dispatches")
+            _, pending = await asyncio.wait(
+                set(self._in_flight), timeout=self.rabbit_client.drain_timeout
+            )
+            if pending:
+                logging.warning(f"{len(pending)} push dispatches still running")
+
+    async def dispatch(self, push_messages: List[PushMessage], attempt: int = 0):
+        """Sends the messages and returns the tickets Expo accepted them with."""
+        task = asyncio.current_task()
+        self._in_flight.add(task)
+        try:
+            size = self.push_client.max_message_count
+            chunks = [
+                push_messages[start : start + size]
+                for start in range(0, len(push_messages), size)
+            ]
+            results = await asyncio.gather(
+                *(self._send_chunk(chunk, attempt) for chunk in chunks)
+            )
+            return [ticket for tickets in results for ticket in tickets]
+        finally:
+            self._in_flight.discard(task)
+
+    async def _send_chunk(self, chunk: List[PushMessage], attempt: int) -> list:
+        await self.bucket.acquire(len(chunk))
+        try:
+            tickets = await self.push_client._publish_internal(chunk)
+        except Exception as e:
+            if self._retryable(e):
+                await self._retry(chunk, attempt, repr(e))
+            else:
+                logging.error(f"Push chunk failed permanently: {e!r}")
+                await self._park(chunk, attempt, repr(e))
+            return []
+
+        self.sent += len(chunk)
+        rate_limited, rejected = [], []
+        for ticket in tickets:
+            error = (ticket.details or {}).get("error")
+            if error == PushTicket.ERROR_MESSAGE_RATE_EXCEEDED:
+                rate_limited.append(ticket.push_message)
+            elif error == PushTicket.ERROR_MESSAGE_TOO_BIG:
+                rejected.append(ticket.push_message)
+        if rate_limited:
+            await self._retry(
+                rate_limited, attempt, PushTicket.ERROR_MESSAGE_RATE_EXCEEDED
+            )
+        if rejected:
+            await self._park(rejected, attempt, PushTicket.ERROR_MESSAGE_TOO_BIG)
+        if self.receipt_reconciler is not None:
+            await self.receipt_reconciler.track(tickets)
+        return tickets
+
+    @staticmethod
+    def _retryable(error: Exception) -> bool:
+        if isinstance(error, httpx.TransportError):
+            return True
+        response = getattr(error, "response", None)
+        if (
+            isinstance(error, (PushServerError, httpx.HTTPStatusError))
+            and response is not None
+        ):
+            return response.status_code == 429 or response.status_code >= 500
+        return False
+
+    async def _retry(self, messages: List[PushMessage], attempt: int, error: str):
+        if attempt >= self.max_attempts:
+            await self._park(messages, attempt, error)
+            return
+        await self._publish(
+            self._retry_routing_key(attempt), messages, attempt + 1, error
+        )
+        self.retried += len(messages)
+
+    async def _park(self, messages: List[PushMessage], attempt: int, error: str):
+        await self._publish("dead", messages, attempt, error)
+        self.parked += len(messages)
+
+    async def _publish(
+        self,
+        routing_key: str,
+        messages: List[PushMessage],
+        attempt: int,
+        error: str,
+    ):
+        await self.rabbit_client.publish_message(
+            routing_key,
+            {"messages": [message._asdict() for message in messages]},
+            headers={"x-attempt": attempt, "x-error": error},
+            exchange_name=self.exchange_name,
+        )
+
+    async def _on_retry(self, message: IncomingMessage):
+        try:
+            data = decode_body(message.body, message.content_type)
+            messages = [PushMessage(**fields) for fields in data["messages"]]
+            attempt = (message.headers or {}).get("x-attempt", 1)
+            await self.dispatch(messages, attempt)
+            await message.ack()
+        except Exception as e:
+            logging.error(f"Failed to retry push messages: {e!r}")
+            # push.dispatch dead-letters rejected messages to push.dead.
+            await message.reject(requeue=False)
+
+    def stats(self) -> dict:
+        return {
+            "sent": self.sent,
+            "retried": self.retried,
+            "parked": self.parked,
+            "rate_limiter": self.bucket.stats(),
+        }
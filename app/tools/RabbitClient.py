@@ -1,5 +1,6 @@
 import asyncio
-from typing import Callable, Optional, Any
+from contextlib import asynccontextmanager
+from typing import Callable, Optional, Any, Dict, List, Set
 import json
 from aio_pika.exceptions import AMQPConnectionError
 from aio_pika import (
@@ -12,7 +13,11 @@ from aio_pika import (
 from ..config import settings
 from bson import json_util
 import logging
-from ..tools.ExponentServerSDK import push_client, PushMessage
+from ..tools.ExponentServerSDK import async_push_client, PushMessage
+from ..tools.MessageCodec import JSON, encode_body, decode_body
+from ..tools.NotificationCoalescer import NotificationCoalescer
+from aio_pika.pool import Pool
+from ..service.TokenService import PushTokenService
 import aio_pika
 from datetime import datetime
 from ..utils import ensure_object_id, DateTimeEncoder
@@ -25,6 +30,27 @@ logging.basicConfig(
 )
 
 
+class _KeyedLocks:
+    """One asyncio.Lock per key, dropped again once nobody holds or waits."""
+
+    def __init__(self):
+        self._locks: Dict[Any, asyncio.Lock] = {}
+        self._users: Dict[Any, int] = {}
+
+    @asynccontextmanager
+    async def hold(self, key):
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        self._users[key] = self._users.get(key, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._users[key] -= 1
+            if not self._users[key]:
+                del self._users[key]
+                del self._locks[key]
+
+
 class RabbitClient:
     """This class implements RabbitMQ Publish and Subscribe async handling.
 
@@ -40,6 +66,8 @@ class RabbitClient:
     :type connection: aio_pika.AbstractRobustConnection
     """
 
+    TEAM_EVENTS_DEAD = "team_events.dead"
+
     # ---------------------------------------------------------
     #
     def __init__(
@@ -47,12 +75,29 @@ class RabbitClient:
         rabbit_url: str,
         service: Optional[str] = None,
         exchange_name: str = "notifications_exchange12",
+        prefetch_count: int = 32,
+        concurrency: int = 16,
+        queue_concurrency: Optional[Dict[str, int]] = None,
+        drain_timeout: float = 30.0,
+        publish_channels: int = 4,
+        content_type: str = JSON,
+        coalesce_window: float = 0,
+        coalesce_max_wait: float = 30.0,
     ):
         """The class initializer.
 
         :param rabbit_url: RabbitMQ's connection URL.
         :param service: Name of message subscription queue.
         :param incoming_message_handler: Received message callback method.
+        :param prefetch_count: Unacked messages the broker may push per queue.
+        :param concurrency: Default number of messages handled at once per queue.
+        :param queue_concurrency: Per-queue overrides of concurrency.
+        :param drain_timeout: Seconds stop() waits for in-flight messages.
+        :param publish_channels: Size of the publisher channel pool.
+        :param content_type: Body encoding, application/json or application/msgpack.
+        :param coalesce_window: Debounce window in seconds for notifications
+            about the same event; 0 sends one push per message.
+        :param coalesce_max_wait: Longest a burst of edits is held back.
         """
         self.channel = None
         self.connection = None
@@ -61,6 +106,23 @@ class RabbitClient:
         self.message_handler = self._process_incoming_message
         self.exchange = None
         self.exchange_name = exchange_name
+        self.push_token_service = PushTokenService()
+        self.prefetch_count = prefetch_count
+        self.concurrency = concurrency
+        self.queue_concurrency = queue_concurrency or {}
+        self.drain_timeout = drain_timeout
+        self._consumers: List[tuple] = []
+        self._in_flight: Set[asyncio.Task] = set()
+        self.publish_channels = publish_channels
+        self.content_type = content_type
+        self.channel_pool: Optional[Pool] = None
+        # Set by PushDispatcher.start; sends are direct until then.
+        self.push_dispatcher = None
+        self.coalescer: Optional[NotificationCoalescer] = None
+        if coalesce_window > 0:
+            self.coalescer = NotificationCoalescer(
+                self._notify_team, coalesce_window, coalesce_max_wait
+            )
 
     # ---------------------------------------------------------
     #
@@ -71,45 +133,51 @@ class RabbitClient:
         """
         logging.debug("Starting message processing")
         try:
-            message_body = message.body.decode()  # Decode bytes to string
-            data = json.loads(message_body)
-            event = data["event"].get("team_id")
-            print(type(event))
-            await self.handle_push_notification(event)
+            data = decode_body(message.body, message.content_type)
+            event = data["event"]
+            if self.coalescer is not None and event.get("_id") is not None:
+                # Acked by the coalescer once the burst has been sent.
+                key = (event.get("team_id"), event["_id"])
+                self.coalescer.submit(key, message, data)
+                return
+            await self._notify_team(data)
 
             logging.debug(f"Received the message: {data}")
             await message.ack()
 
-        except json.JSONDecodeError as e:
-            logging.error(
-                f"JSON decode error: {e} - Message Body: {message.body.decode()}"
-            )
+        except ValueError as e:
+            logging.error(f"Decode error: {e} - Message Body: {message.body!r}")
+            await message.reject(requeue=False)
         except Exception as e:
             logging.error(f"Failed to process message: {str(e)}")
+            # An unacked message would hold one prefetch slot forever. The
+            # shard queues dead-letter it to team_events.dead.
+            await message.reject(requeue=False)
+
+    async def _notify_team(self, data: dict):
+        return await self.handle_push_notification(data["event"].get("team_id"))
 
     async def handle_push_notification(self, data):
         # Here you'd use the details from `data` to create your push message
         logging.debug(f"Received data for push notification: {data}")
-        try:
-            expo_ids = await push_token_service.get_team_player_tokens(team_id=data)
-            # Prepare an array of PushMessage objects
-            print(expo_ids)
-            push_messages = [
-                PushMessage(
-                    to=token,
-                    title="New Message From Your Coach !!",
-                    body="Check it out that",
-                    data={"message": data},
-                )
-                for token in expo_ids
-            ]
-            # Send the notification
-            push_tickets = push_client.publish_multiple(push_messages)
-            return {"status": "Success", "ticket": push_tickets}
-
-        except Exception as e:
-            # Catch any broad exceptions and return as HTTP error
-            logging.error(f"Failed to process message: {str(e)}")
+        expo_ids = await self.push_token_service.get_team_player_tokens(team_id=data)
+        # Prepare an array of PushMessage objects
+        push_messages = [
+            PushMessage(
+                to=token,
+                title="New Message From Your Coach !!",
+                body="Check it out that",
+                data={"message": data},
+            )
+            for token in expo_ids
+        ]
+        # Send the notification. Expo failures are retried by the dispatcher
+        # through RabbitMQ; anything raised here rejects the event message.
+        if self.push_dispatcher is not None:
+            push_tickets = await self.push_dispatcher.dispatch(push_messages)
+        else:
+            push_tickets = await async_push_client.publish_multiple(push_messages)
+        return {"status": "Success", "ticket": push_tickets}
 
     # ---------------------------------------------------------
     #
@@ -149,11 +217,19 @@ class RabbitClient:
         self.channel = await self.connection.channel()
 
         # Declare the exchange using the newly established channel.
+        # Consumers get channels of their own, see start_consumer.
         self.exchange = await self.channel.declare_exchange(
             self.exchange_name, aio_pika.ExchangeType.TOPIC, durable=True
         )
-        # Set Quality of Service for the channel.
-        await self.channel.set_qos(prefetch_count=1)
+
+        # Publishers share a small pool of confirm-mode channels so that
+        # concurrent publishes are not serialised on one channel.
+        self.channel_pool = Pool(
+            self._open_publish_channel, max_size=self.publish_channels
+        )
+
+    async def _open_publish_channel(self):
+        return await self.connection.channel(publisher_confirms=True)
 
     async def declare_and_bind_queue(self, queue_name: str, routing_keys: list):
         """Declare a new queue and bind it with specific routing keys."""
@@ -164,26 +240,237 @@ class RabbitClient:
             f"Queue {queue_name} declared and bound with routing keys: {routing_keys}"
         )
 
-    async def publish_message(self, routing_key: str, message: dict):
-        """Publish a message with specific routing keys."""
-        # if hasattr(message, "dict"):
-        #     message = message.dict()
+    async def declare_team_shards(self, shard_count: int) -> List[str]:
+        """Declare the sharded topology for team events.
+
+        Every ``team.*.event.*`` message is forwarded from the topic exchange
+        to a consistent-hash exchange that hashes on the ``team_id`` header,
+        so all events of one team land on the same shard queue and keep
+        their order. Shard queues use single-active-consumer, so ordering
+        holds even when several replicas subscribe to the same shard.
+        Messages a handler rejects are dead-lettered to team_events.dead
+        instead of being dropped. Requires the
+        rabbitmq_consistent_hash_exchange plugin.
+        """
+        dead_exchange = await self.channel.declare_exchange(
+            f"{self.exchange_name}.team_shards.dead",
+            aio_pika.ExchangeType.FANOUT,
+            durable=True,
+        )
+        dead = await self.channel.declare_queue(self.TEAM_EVENTS_DEAD, durable=True)
+        await dead.bind(dead_exchange)
+
+        shard_exchange = await self.channel.declare_exchange(
+            f"{self.exchange_name}.team_shards",
+            "x-consistent-hash",
+            durable=True,
+            arguments={"hash-header": "team_id"},
+        )
+        await shard_exchange.bind(self.exchange, routing_key="team.*.event.*")
+
+        queue_names = []
+        for shard in range(shard_count):
+            queue_name = f"team_events.shard.{shard}"
+            queue = await self.channel.declare_queue(
+                queue_name,
+                durable=True,
+                arguments={
+                    "x-single-active-consumer": True,
+                    "x-dead-letter-exchange": dead_exchange.name,
+                },
+            )
+            # For the consistent-hash exchange the binding key is a weight.
+            await queue.bind(shard_exchange, routing_key="1")
+            queue_names.append(queue_name)
+        logging.info(f"Declared {shard_count} team event shards")
+        return queue_names
+
+    async def start_team_consumers(
+        self, shard_count: int, replica_index: int = 0, replica_count: int = 1
+    ):
+        """Subscribe to every team event shard, preferring this replica's share.
+
+        Every replica subscribes to every shard queue and single-active-
+        consumer lets exactly one of them receive a shard's messages, so a
+        replica that dies is replaced on its shards right away. Shard i is
+        preferred by replica i % replica_count: its consumer gets a higher
+        priority, which RabbitMQ 3.12+ uses to pick the active consumer, so
+        with all replicas up the shards are still spread across them. On
+        older brokers the first replica to subscribe stays active on all
+        shards. Within a shard, messages of the same team are handled one
+        at a time in delivery order.
+        """
+        queue_names = await self.declare_team_shards(shard_count)
+        for shard, queue_name in enumerate(queue_names):
+            preferred = shard % replica_count == replica_index
+            await self.start_consumer(
+                queue_name,
+                ordering_header="team_id",
+                consumer_priority=10 if preferred else 0,
+            )
 
+    def _build_message(self, message: Any, headers: Optional[dict] = None):
         if hasattr(message, "dict"):
             message = message.dict()
-        body = json.dumps(message, indent=4, sort_keys=True, default=str).encode()
-        msg = Message(
-            body, content_type="application/json", delivery_mode=DeliveryMode.PERSISTENT
+        return Message(
+            encode_body(message, self.content_type),
+            content_type=self.content_type,
+            delivery_mode=DeliveryMode.PERSISTENT,
+            headers=headers,
         )
 
-        await self.exchange.publish(msg, routing_key=routing_key)
+    async def publish_message(
+        self,
+        routing_key: str,
+        message: dict,
+        headers: Optional[dict] = None,
+        exchange_name: Optional[str] = None,
+    ):
+        """Publish a message with specific routing keys.
+
+        Goes to the main exchange unless exchange_name is given. Returns
+        once the broker has confirmed the message.
+        """
+        msg = self._build_message(message, headers)
+        async with self.channel_pool.acquire() as channel:
+            exchange = await channel.get_exchange(
+                exchange_name or self.exchange_name, ensure=False
+            )
+            await exchange.publish(msg, routing_key=routing_key)
         logging.info(f"Message published to {routing_key}")
 
-    async def start_consumer(self, queue_name: str):
-        """Start consuming messages from a specified queue."""
-        queue = await self.channel.get_queue(queue_name)
-        await queue.consume(self._process_incoming_message, no_ack=False)
-        logging.info(f"Started consuming from {queue_name}")
+    async def publish_many(self, messages: List[tuple]) -> List[Any]:
+        """Publish (routing_key, message, headers) tuples on one channel.
+
+        All messages are sent before any confirm is awaited, so the broker
+        round trips overlap. Returns one entry per message: None when the
+        broker confirmed it, otherwise the exception.
+        """
+        async with self.channel_pool.acquire() as channel:
+            exchange = await channel.get_exchange(self.exchange_name, ensure=False)
+            results = await asyncio.gather(
+                *(
+                    exchange.publish(
+                        self._build_message(message, headers), routing_key=routing_key
+                    )
+                    for routing_key, message, headers in messages
+                ),
+                return_exceptions=True,
+            )
+        logging.info(f"Published {len(messages)} messages")
+        return [
+            result if isinstance(result, Exception) else None for result in results
+        ]
+
+    async def start_consumer(
+        self,
+        queue_name: str,
+        prefetch_count: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        ordering_header: Optional[str] = None,
+        handler: Optional[Callable] = None,
+        consumer_priority: Optional[int] = None,
+    ):
+        """Start consuming messages from a specified queue.
+
+        Each queue gets its own channel, so its prefetch window and its
+        handler concurrency are independent of other queues. Up to
+        concurrency messages are handled at the same time. When
+        ordering_header is set, messages sharing that header value are
+        handled one after another in delivery order. handler replaces the
+        default message_handler for this queue. consumer_priority is sent
+        as x-priority.
+        """
+        prefetch_count = prefetch_count or self.prefetch_count
+        concurrency = (
+            concurrency or self.queue_concurrency.get(queue_name) or self.concurrency
+        )
+
+        channel = await self.connection.channel()
+        await channel.set_qos(prefetch_count=prefetch_count)
+        queue = await channel.get_queue(queue_name)
+        semaphore = asyncio.Semaphore(concurrency)
+        ordering_locks = _KeyedLocks()
+        handler = handler or self.message_handler
+
+        async def handle(message: IncomingMessage):
+            async with semaphore:
+                await handler(message)
+
+        async def on_message(message: IncomingMessage):
+            task = asyncio.current_task()
+            self._in_flight.add(task)
+            try:
+                key = (message.headers or {}).get(ordering_header)
+                if ordering_header and key is not None:
+                    # Take the key lock before the semaphore: asyncio locks
+                    # are FIFO, which preserves delivery order per key.
+                    async with ordering_locks.hold(key):
+                        await handle(message)
+                else:
+                    await handle(message)
+            finally:
+                self._in_flight.discard(task)
+
+        arguments = None
+        if consumer_priority is not None:
+            arguments = {"x-priority": consumer_priority}
+        consumer_tag = await queue.consume(
+            on_message, no_ack=False, arguments=arguments
+        )
+        self._consumers.append((channel, queue, consumer_tag))
+        logging.info(
+            f"Started consuming from {queue_name} "
+            f"(prefetch={prefetch_count}, concurrency={concurrency})"
+        )
+
+    async def cancel_consumer(self, queue_name: str):
+        """Stop deliveries from one queue.
+
+        Messages already delivered keep running; the channel stays open so
+        they can still be acked, and is closed by stop_consumers.
+        """
+        for i, (channel, queue, consumer_tag) in enumerate(self._consumers):
+            if queue.name == queue_name and consumer_tag is not None:
+                await self._cancel(queue, consumer_tag)
+                self._consumers[i] = (channel, queue, None)
+
+    @staticmethod
+    async def _cancel(queue, consumer_tag):
+        try:
+            await queue.cancel(consumer_tag)
+        except Exception as e:
+            logging.error(f"Failed to cancel consumer on {queue.name}: {e}")
+
+    async def stop_consumers(self):
+        """Stop deliveries, then wait for in-flight messages to finish.
+
+        Messages still running after drain_timeout stay unacked and are
+        redelivered by the broker once the connection closes.
+        """
+        for channel, queue, consumer_tag in self._consumers:
+            if consumer_tag is not None:
+                await self._cancel(queue, consumer_tag)
+
+        if self._in_flight:
+            logging.info(f"Draining {len(self._in_flight)} in-flight messages")
+            _, pending = await asyncio.wait(
+                set(self._in_flight), timeout=self.drain_timeout
+            )
+            if pending:
+                logging.warning(f"{len(pending)} messages still in flight")
+
+        if self.coalescer is not None:
+            # Held bursts are sent now rather than redelivered and re-sent.
+            try:
+                await asyncio.wait_for(self.coalescer.drain(), self.drain_timeout)
+            except asyncio.TimeoutError:
+                logging.warning("Timed out flushing coalesced notifications")
+
+        for channel, _, _ in self._consumers:
+            if not channel.is_closed:
+                await channel.close()
+        self._consumers.clear()
 
     @property
     def is_connected(self) -> bool:
@@ -200,5 +487,9 @@ class RabbitClient:
     #
     async def stop(self):
         """Stop the used resources in a controlled way."""
+        await self.stop_consumers()
+        if self.channel_pool is not None:
+            await self.channel_pool.close()
+            self.channel_pool = None
         if self.connection:
             await self.connection.close()
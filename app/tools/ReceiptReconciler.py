@@ -0,0 +1,135 @@
+import asyncio
+import logging
+from typing import Optional
+from .ExponentServerSDK import PushServerError, PushTicket
+from ..service.PushReceiptService import PushReceiptService
+from ..service.TokenService import PushTokenService
+
+
+class ReceiptReconciler:
+    """Polls Expo push receipts and prunes tokens of uninstalled apps.
+
+    Ticket ids are stored when a fan-out is sent. Once they are due, they
+    are checked in batches of up to 1000 ids (Expo's limit per request).
+    Tokens that come back DeviceNotRegistered, on the ticket or on the
+    receipt, are deleted from push_token so later fan-outs skip them.
+
+    :ivar push_client: AsyncPushClient used for /push/getReceipts.
+    :ivar delay_seconds: Wait before a ticket's receipt is first checked.
+    :ivar poll_interval: Seconds between passes when nothing is due.
+    :ivar batch_size: Ticket ids per getReceipts request.
+    """
+
+    def __init__(
+        self,
+        push_client,
+        receipt_service: PushReceiptService = None,
+        token_service: PushTokenService = None,
+        delay_seconds: int = 900,
+        poll_interval: float = 60.0,
+        batch_size: int = 1000,
+    ):
+        self.push_client = push_client
+        self.receipt_service = receipt_service or PushReceiptService()
+        self.token_service = token_service or PushTokenService()
+        self.delay_seconds = delay_seconds
+        self.poll_interval = poll_interval
+        self.batch_size = min(batch_size, push_client.max_receipt_count)
+        self._task: Optional[asyncio.Task] = None
+        self.tracked = 0
+        self.checked = 0
+        self.pruned = 0
+
+    async def track(self, tickets) -> None:
+        """Records the tickets of a fan-out and prunes tokens rejected outright."""
+        dead = [
+            ticket.push_message.to
+            for ticket in tickets
+            if self._device_not_registered(ticket)
+        ]
+        self.tracked += await self.receipt_service.record(tickets, self.delay_seconds)
+        if dead:
+            self.pruned += await self.token_service.prune_tokens(dead)
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                checked = await self.reconcile_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Push receipt pass failed: {e}")
+                checked = 0
+            # A full batch means more receipts are probably due already.
+            if checked < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    async def reconcile_once(self) -> int:
+        """Checks one batch of due tickets and returns how many were due."""
+        rows = await self.receipt_service.due(self.batch_size)
+        if not rows:
+            return 0
+
+        tickets = [
+            PushTicket(
+                push_message=None, status=None, message=None, details=None, id=row["_id"]
+            )
+            for row in rows
+        ]
+        try:
+            receipts = await self.push_client.check_receipts(tickets)
+        except PushServerError as e:
+            logging.error(f"Push receipt request failed: {e}")
+            await self.receipt_service.postpone(
+                [row["_id"] for row in rows], self.delay_seconds
+            )
+            return len(rows)
+
+        tokens = {row["_id"]: row["token"] for row in rows}
+        received = {receipt.id for receipt in receipts}
+        dead = [
+            tokens[receipt.id]
+            for receipt in receipts
+            if self._device_not_registered(receipt) and receipt.id in tokens
+        ]
+        for receipt in receipts:
+            if not receipt.is_success() and not self._device_not_registered(receipt):
+                logging.warning(
+                    f"Push receipt {receipt.id} failed: {receipt.message}"
+                    f" {receipt.details}"
+                )
+
+        # Receipts Expo has not produced yet are simply absent from the reply.
+        await self.receipt_service.remove(list(received))
+        await self.receipt_service.postpone(
+            [row["_id"] for row in rows if row["_id"] not in received],
+            self.delay_seconds,
+        )
+        if dead:
+            self.pruned += await self.token_service.prune_tokens(dead)
+        self.checked += len(received)
+        return len(rows)
+
+    @staticmethod
+    def _device_not_registered(ticket) -> bool:
+        return (
+            not ticket.is_success()
+            and bool(ticket.details)
+            and ticket.details.get("error") == PushTicket.ERROR_DEVICE_NOT_REGISTERED
+        )
+
+    def stats(self) -> dict:
+        return {"tracked": self.tracked, "checked": self.checked, "pruned": self.pruned}
@@ -0,0 +1,47 @@
+import asyncio
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Asyncio token bucket.
+
+    Tokens refill continuously at `rate` per second up to `capacity`.
+    Waiters are served in arrival order, so a large request is not starved
+    by a stream of small ones.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self.waited = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, n: float = 1):
+        """Waits until n tokens are available and takes them."""
+        n = min(n, self.capacity)
+        if self._lock is None:
+            # Created on first use so it binds to the running loop.
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            self._refill()
+            while self.tokens < n:
+                delay = (n - self.tokens) / self.rate
+                self.waited += delay
+                await asyncio.sleep(delay)
+                self._refill()
+            self.tokens -= n
+
+    def stats(self) -> dict:
+        return {
+            "rate": self.rate,
+            "tokens": round(self.tokens, 1),
+            "waited_seconds": round(self.waited, 3),
+        }
@@ -0,0 +1,98 @@
+import asyncio
+import logging
+from typing import Optional
+from aio_pika import IncomingMessage
+from .MessageCodec import decode_body
+from .WebSocketManager import ConnectionManager
+
+
+class WebSocketBridge:
+    """Delivers team events published by any replica to local WebSockets.
+
+    Each worker process declares its own exclusive, auto-delete queue on the
+    RabbitClient topic exchange and binds ``team.<id>.event.*`` only for the
+    teams that currently have a member connected to this process. Incoming
+    events are fanned out through the ConnectionManager, so adding workers
+    adds delivery capacity without any extra infrastructure.
+
+    :ivar rabbit_client: Connected RabbitClient.
+    :ivar manager: The process-local ConnectionManager.
+    """
+
+    def __init__(
+        self, rabbit_client, manager: ConnectionManager, prefetch_count: int = 100
+    ):
+        self.rabbit_client = rabbit_client
+        self.manager = manager
+        self.prefetch_count = prefetch_count
+        self.channel = None
+        self.exchange = None
+        self.queue = None
+        self._ops: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.delivered = 0
+
+    async def start(self):
+        self.channel = await self.rabbit_client.connection.channel()
+        await self.channel.set_qos(prefetch_count=self.prefetch_count)
+        self.exchange = await self.channel.get_exchange(
+            self.rabbit_client.exchange_name, ensure=False
+        )
+        # Server-named, deleted by the broker when this worker goes away.
+        self.queue = await self.channel.declare_queue(exclusive=True, auto_delete=True)
+
+        self._ops = asyncio.Queue()
+        for team_id in list(self.manager.team_members):
+            self.team_added(team_id)
+        self.manager.team_listeners.append(self)
+        self._task = asyncio.create_task(self._apply_bindings())
+
+        await self.queue.consume(self._on_message, no_ack=True)
+        logging.info(f"WebSocket bridge consuming from {self.queue.name}")
+
+    async def stop(self):
+        if self in self.manager.team_listeners:
+            self.manager.team_listeners.remove(self)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.channel is not None and not self.channel.is_closed:
+            await self.channel.close()
+
+    def team_added(self, team_id: str):
+        self._ops.put_nowait(("bind", team_id))
+
+    def team_removed(self, team_id: str):
+        self._ops.put_nowait(("unbind", team_id))
+
+    async def _apply_bindings(self):
+        # Bindings change in the order members come and go.
+        while True:
+            op, team_id = await self._ops.get()
+            routing_key = f"team.{team_id}.event.*"
+            try:
+                if op == "bind":
+                    await self.queue.bind(self.exchange, routing_key=routing_key)
+                else:
+                    await self.queue.unbind(self.exchange, routing_key=routing_key)
+            except Exception as e:
+                logging.error(f"Failed to {op} {routing_key}: {e}")
+
+    async def _on_message(self, message: IncomingMessage):
+        try:
+            data = decode_body(message.body, message.content_type)
+            # routing key: team.<team_id>.event.<action>
+            team_id = message.routing_key.split(".")[1]
+            self.delivered += await self.manager.broadcast_to_team(team_id, data)
+        except Exception as e:
+            logging.error(f"WebSocket bridge failed to deliver: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "queue": self.queue.name if self.queue else None,
+            "delivered": self.delivered,
+        }
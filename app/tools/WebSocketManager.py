@@ -1,34 +1,120 @@
 from fastapi import WebSocket
-from typing import Dict, List
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Set
+from .MessageCodec import encode_body
 import asyncio
+import logging
+import time
 
-CONNECTIONS = []
+# user_id -> sockets of that user held by this process
+CONNECTIONS: Dict[str, Set[WebSocket]] = {}
 
 
 class ConnectionManager:
-    # INITIALIZE THE LIST AND CONNECTION
-    def __init__(self):
-        self.active_connections: List[Dict[int, WebSocket]] = CONNECTIONS
+    # INITIALIZE THE REGISTRY
+    def __init__(self, send_timeout: float = 2.0):
+        self.active_connections: Dict[str, Set[WebSocket]] = CONNECTIONS
+        self.team_members: Dict[str, Set[str]] = {}
+        self.user_teams: Dict[str, Set[str]] = {}
+        self.send_timeout = send_timeout
+        self.evicted = 0
+        # Objects with team_added(team_id) / team_removed(team_id), told when
+        # a team gains its first or loses its last local member.
+        self.team_listeners: list = []
+        self.heartbeat: Optional["HeartbeatScheduler"] = None
 
-    # CONNECT TO WEBSOCKET AND APPEND TO THE LIST
-    async def connect(self, websocket: WebSocket, connection_id: int):
+    # ACCEPT THE WEBSOCKET AND INDEX IT BY USER AND TEAM
+    async def connect(
+        self, websocket: WebSocket, connection_id: str, team_ids: Iterable[str] = ()
+    ):
         await websocket.accept()
-        self.active_connections.append({connection_id: websocket})
+        user_id = str(connection_id)
+        self.active_connections.setdefault(user_id, set()).add(websocket)
+        if self.heartbeat is not None:
+            self.heartbeat.add(websocket, user_id)
+        teams = self.user_teams.setdefault(user_id, set())
+        for team_id in map(str, team_ids):
+            teams.add(team_id)
+            if team_id not in self.team_members:
+                self.team_members[team_id] = set()
+                for listener in self.team_listeners:
+                    listener.team_added(team_id)
+            self.team_members[team_id].add(user_id)
 
-    # PURGE WEBSOCKET LIST STORE
-    def disconnect(self, user_id: int):
-        for web_dict in self.active_connections:
-            if web_dict.get(user_id):
-                self.active_connections.remove(web_dict)
+    # PURGE ONE SOCKET, OR EVERY SOCKET OF THE USER
+    def disconnect(self, user_id: str, websocket: Optional[WebSocket] = None):
+        user_id = str(user_id)
+        sockets = self.active_connections.get(user_id)
+        if sockets is None:
+            return
+        removed = list(sockets) if websocket is None else [websocket]
+        for ws in removed:
+            sockets.discard(ws)
+            if self.heartbeat is not None:
+                self.heartbeat.remove(ws)
+        if sockets:
+            return
+
+        del self.active_connections[user_id]
+        for team_id in self.user_teams.pop(user_id, ()):
+            members = self.team_members.get(team_id)
+            if members is not None:
+                members.discard(user_id)
+                if not members:
+                    del self.team_members[team_id]
+                    for listener in self.team_listeners:
+                        listener.team_removed(team_id)
 
     # SEND MESSAGE AFTER WEBSOCKET IS ALIVE
     async def send_personal_message(self, message: dict):
-        user_ws = self.get_ws(message["user_id"])
-        if user_ws != None:
-            websocket: WebSocket = user_ws
-            await websocket.send_json(message)
+        return await self.send_to_users([message["user_id"]], message) > 0
+
+    # SEND ONE MESSAGE TO EVERY LOCAL MEMBER OF A TEAM
+    async def broadcast_to_team(self, team_id: str, message: dict) -> int:
+        return await self.send_to_users(
+            self.team_members.get(str(team_id), ()), message
+        )
+
+    async def send_to_users(self, user_ids: Iterable[str], message: dict) -> int:
+        """Sends to all sockets of the given users concurrently.
+
+        The message is serialised once. A socket that errors or does not
+        accept the frame within send_timeout is closed and evicted, so one
+        slow client cannot hold up the rest. Returns the number of sockets
+        the message reached.
+        """
+        targets = [
+            (user_id, websocket)
+            for user_id in map(str, user_ids)
+            for websocket in self.active_connections.get(user_id, ())
+        ]
+        if not targets:
+            return 0
+
+        text = encode_body(message).decode()
+        results = await asyncio.gather(
+            *(self._send(websocket, text) for _, websocket in targets)
+        )
+        for (user_id, websocket), delivered in zip(targets, results):
+            if not delivered:
+                await self.evict(user_id, websocket)
+        return sum(results)
+
+    async def _send(self, websocket: WebSocket, text: str) -> bool:
+        try:
+            await asyncio.wait_for(websocket.send_text(text), self.send_timeout)
             return True
-        return False
+        except Exception as e:
+            logging.debug(f"WebSocket send failed: {e!r}")
+            return False
+
+    async def evict(self, user_id: str, websocket: WebSocket):
+        self.disconnect(user_id, websocket)
+        self.evicted += 1
+        try:
+            await websocket.close(code=1013)
+        except Exception:
+            pass
 
     # Keep the WebSocket alive.
     async def ping(self, websocket: WebSocket):
@@ -38,36 +124,145 @@ class ConnectionManager:
     async def reply(self, websocket: WebSocket):
         await websocket.send_text("Reply Pong")
 
-    # Listening to the Websocket and sending message.
-    async def pong(self, websocket: WebSocket):
-        await self.reply(websocket)
-        try:
-            pong = await asyncio.wait_for(websocket.receive_text(), timeout=5)
-            if pong == "pong":
-                return True
-            else:
-                return False
+    # Record that the client is alive; called for every frame received.
+    def touch(self, websocket: WebSocket):
+        if self.heartbeat is not None:
+            self.heartbeat.touch(websocket)
 
-        except asyncio.exceptions.TimeoutError as e:
-            return False
+    # Fetch a WebSocket of the user if one exists.
+    def get_ws(self, user_id: str) -> Optional[WebSocket]:
+        sockets = self.active_connections.get(str(user_id))
+        return next(iter(sockets)) if sockets else None
 
-    # Fetch WebSocket and return them if it exists.
-    def get_ws(self, user_id: int):
-        for web_dict in self.active_connections:
-            if web_dict.get(user_id):
-                return web_dict[user_id]
-
-    # Send a retry message to a user WebSocket
+    # Send a notification to a user's WebSockets
     async def personal_notification(self, message: dict):
-        connection_check = self.get_ws(message["message"]["user_id"])
-        if connection_check:
-            connection_check: WebSocket
-            await connection_check.send_json(message)
-            await asyncio.sleep(2)
+        user_id = message["message"]["user_id"]
+        if await self.send_to_users([user_id], message):
             return True
-        else:
-            del self.active_connections[message["message"]["user_id"]]
-            return False
+        self.disconnect(user_id)
+        return False
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self.active_connections),
+            "sockets": sum(len(s) for s in self.active_connections.values()),
+            "teams": len(self.team_members),
+            "evicted": self.evicted,
+        }
+
+
+class HeartbeatScheduler:
+    """Pings every registered socket from one background task.
+
+    Sockets are spread over a timing wheel of `slots` buckets; each tick
+    handles one bucket, so every socket is pinged once per `interval`
+    without a burst of sends. The client answers "Reply Pong" with "pong",
+    and any frame it sends counts as a sign of life. Sockets not heard from
+    within `timeout` are evicted together when their bucket comes up.
+    """
+
+    PING = "Reply Pong"
+
+    def __init__(
+        self,
+        manager: ConnectionManager,
+        interval: float = 30.0,
+        timeout: float = 75.0,
+        slots: int = 30,
+    ):
+        self.manager = manager
+        self.interval = interval
+        self.timeout = timeout
+        self.wheel: List[Dict[WebSocket, str]] = [{} for _ in range(slots)]
+        self.slot_of: Dict[WebSocket, int] = {}
+        self.last_seen: Dict[WebSocket, float] = {}
+        self._next_slot = 0
+        self._current = 0
+        self._task: Optional[asyncio.Task] = None
+
+        self.pings_sent = 0
+        self.reaped = 0
+        self._recent_reaps: Deque[tuple] = deque()
+
+    def add(self, websocket: WebSocket, user_id: str):
+        # Round-robin placement keeps the buckets evenly filled.
+        slot = self._next_slot
+        self._next_slot = (self._next_slot + 1) % len(self.wheel)
+        self.wheel[slot][websocket] = user_id
+        self.slot_of[websocket] = slot
+        self.last_seen[websocket] = time.monotonic()
+
+    def remove(self, websocket: WebSocket):
+        slot = self.slot_of.pop(websocket, None)
+        if slot is not None:
+            self.wheel[slot].pop(websocket, None)
+        self.last_seen.pop(websocket, None)
+
+    def touch(self, websocket: WebSocket):
+        if websocket in self.last_seen:
+            self.last_seen[websocket] = time.monotonic()
+
+    async def start(self):
+        if self._task is None:
+            self.manager.heartbeat = self
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        tick = self.interval / len(self.wheel)
+        while True:
+            await asyncio.sleep(tick)
+            try:
+                await self.beat()
+            except Exception as e:
+                logging.error(f"Heartbeat tick failed: {e}")
+
+    async def beat(self):
+        """Handles the current bucket and advances the wheel."""
+        bucket = self.wheel[self._current]
+        self._current = (self._current + 1) % len(self.wheel)
+        if not bucket:
+            return
+
+        deadline = time.monotonic() - self.timeout
+        dead, alive = [], []
+        for websocket, user_id in bucket.items():
+            if self.last_seen.get(websocket, 0) < deadline:
+                dead.append((user_id, websocket))
+            else:
+                alive.append((user_id, websocket))
+
+        results = await asyncio.gather(
+            *(self.manager._send(websocket, self.PING) for _, websocket in alive)
+        )
+        self.pings_sent += len(alive)
+        dead.extend(target for target, sent in zip(alive, results) if not sent)
+
+        if dead:
+            await asyncio.gather(
+                *(self.manager.evict(user_id, websocket) for user_id, websocket in dead)
+            )
+            self.reaped += len(dead)
+            self._recent_reaps.append((time.monotonic(), len(dead)))
+
+    def stats(self) -> dict:
+        horizon = time.monotonic() - 60
+        while self._recent_reaps and self._recent_reaps[0][0] < horizon:
+            self._recent_reaps.popleft()
+        return {
+            "connections": len(self.last_seen),
+            "pings_sent": self.pings_sent,
+            "reaped": self.reaped,
+            "reaped_last_minute": sum(n for _, n in self._recent_reaps),
+        }
 
 
 manager = ConnectionManager()
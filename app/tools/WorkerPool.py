@@ -0,0 +1,91 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional
+import asyncio
+import time
+
+
+class WorkerPool:
+    """Runs blocking, CPU-bound callables off the event loop.
+
+    Work is submitted to a thread or process executor, and at most
+    max_concurrency calls are handed to it at once; the rest wait on a
+    semaphore so a burst cannot queue unbounded work inside the executor.
+    Queue depth and wait time are tracked for sizing.
+
+    :ivar kind: "thread" or "process".
+    :ivar max_workers: Number of executor workers.
+    :ivar max_concurrency: Calls allowed in the executor at the same time.
+    """
+
+    def __init__(
+        self,
+        kind: str = "thread",
+        max_workers: int = 4,
+        max_concurrency: Optional[int] = None,
+    ):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown worker pool kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency or max_workers
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        self.queued = 0
+        self.in_flight = 0
+        self.max_queued = 0
+        self.completed = 0
+        self.wait_seconds = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="worker-pool"
+                )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._executor
+
+    async def run(self, fn: Callable, *args):
+        """Runs fn(*args) in the pool and returns its result."""
+        executor = self._get_executor()
+        loop = asyncio.get_running_loop()
+
+        self.queued += 1
+        self.max_queued = max(self.max_queued, self.queued)
+        started = time.perf_counter()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+        self.wait_seconds += time.perf_counter() - started
+
+        self.in_flight += 1
+        try:
+            return await loop.run_in_executor(executor, fn, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_concurrency": self.max_concurrency,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "avg_wait_ms": (
+                1000 * self.wait_seconds / self.completed if self.completed else 0.0
+            ),
+        }
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+            self._semaphore = None
@@ -1,9 +1,23 @@
 from passlib.context import CryptContext
-from bson import ObjectId
+from bson import ObjectId, json_util
+import base64
 import json
 import datetime
+from .config import settings
+from .tools.WorkerPool import WorkerPool
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes made with a different cost factor are reported by verify_and_update
+# so they can be upgraded on the next successful login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
+
+# bcrypt is CPU bound, so hashing runs here instead of on the event loop.
+password_pool = WorkerPool(
+    kind=settings.PASSWORD_HASH_EXECUTOR,
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_concurrency=settings.PASSWORD_HASH_MAX_CONCURRENCY,
+)
 
 
 def hash_password(password: str):
@@ -14,6 +28,28 @@ def verify_password(password: str, hashed_password: str):
     return pwd_context.verify(password, hashed_password)
 
 
+def verify_and_update_password(password: str, hashed_password: str):
+    """
+    Returns (valid, new_hash). new_hash is None unless the password is valid
+    and the stored hash uses an outdated cost factor.
+    """
+    return pwd_context.verify_and_update(password, hashed_password)
+
+
+async def hash_password_async(password: str):
+    return await password_pool.run(hash_password, password)
+
+
+async def verify_password_async(password: str, hashed_password: str):
+    return await password_pool.run(verify_password, password, hashed_password)
+
+
+async def verify_and_update_password_async(password: str, hashed_password: str):
+    return await password_pool.run(
+        verify_and_update_password, password, hashed_password
+    )
+
+
 class JSONEncoder(json.JSONEncoder):
     def default(self, o):
         if isinstance(o, ObjectId):
@@ -35,6 +71,24 @@ def ensure_object_id(id):
     return ObjectId(id) if not isinstance(id, ObjectId) else id
 
 
+def encode_cursor(values: list) -> str:
+    """
+    Packs the sort key values of a document into an opaque pagination cursor.
+    BSON types such as datetime and ObjectId survive the round trip.
+    """
+    return base64.urlsafe_b64encode(json_util.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> list:
+    """
+    Reverses encode_cursor. Raises ValueError for a malformed cursor.
+    """
+    try:
+        return json_util.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
 class DateTimeEncoder(json.JSONEncoder):
 
     def default(self, obj):
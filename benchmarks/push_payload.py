@@ -0,0 +1,81 @@
+"""Request body cost of a 10k-recipient team broadcast.
+
+Before: get_payload() per recipient and one json.dumps of each 100-message
+chunk. After: AsyncPushClient.encode_messages, which sends identical
+messages as one message with an array `to` and serialises the shared
+payload once per chunk. Reports time and bytes on the wire (raw and
+gzipped). No network needed:
+
+    python -m benchmarks.push_payload --n 10000 --repeat 20
+"""
+import argparse
+import gzip
+import json
+import statistics
+import time
+
+from app.tools.ExponentServerSDK import AsyncPushClient, PushMessage
+
+
+def team_broadcast(n: int) -> list:
+    return [
+        PushMessage(
+            to=f"ExponentPushToken[{i:022d}]",
+            title="New Message From Your Coach !!",
+            body="Check it out that",
+            data={"message": "663be0c3b6f73eaa9b08b048"},
+        )
+        for i in range(n)
+    ]
+
+
+def chunks(messages: list, size: int) -> list:
+    return [messages[i : i + size] for i in range(0, len(messages), size)]
+
+
+def encode_before(batches: list) -> list:
+    return [
+        json.dumps([pm.get_payload() for pm in batch]).encode() for batch in batches
+    ]
+
+
+def timed(fn, batches: list, repeat: int):
+    samples, bodies = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        bodies = fn(batches)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples, bodies
+
+
+def report(name: str, samples: list, bodies: list):
+    raw = sum(len(body) for body in bodies)
+    compressed = sum(len(gzip.compress(body)) for body in bodies)
+    print(
+        f"{name:<24} median {statistics.median(samples):8.2f} ms"
+        f"   {raw / 1024:8.1f} KiB raw   {compressed / 1024:7.1f} KiB gzip"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    client = AsyncPushClient()
+    batches = chunks(team_broadcast(args.n), client.max_message_count)
+    print(f"{args.n} recipients in {len(batches)} chunks, {args.repeat} runs each")
+    report("per-recipient payloads", *timed(encode_before, batches, args.repeat))
+    report(
+        "shared body, array to",
+        *timed(
+            lambda b: [client.encode_messages(batch)[0] for batch in b],
+            batches,
+            args.repeat,
+        ),
+    )
+
+
+if __name__ == "__main__":
+    main()
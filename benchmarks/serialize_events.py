@@ -0,0 +1,78 @@
+"""Serialisation cost of a 10k-event list response.
+
+Before: jsonable_encoder + json.dumps, which is what FastAPI does for a
+returned dict. After: MongoJSONResponse.render (orjson) on the raw
+documents. No database needed:
+
+    python -m benchmarks.serialize_events --n 10000 --repeat 20
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+
+import app.models.event_schemas  # noqa: F401  registers the ObjectId encoders
+from app.tools.JSONResponse import MongoJSONResponse
+
+
+def sample_events(n: int) -> list:
+    team_id = ObjectId()
+    start = datetime.utcnow()
+    return [
+        {
+            "_id": ObjectId(),
+            "event_type": "Practice",
+            "place": "Field 2",
+            "event_date": start + timedelta(hours=i),
+            "created_at": start,
+            "team_id": team_id,
+            "creator_id": ObjectId(),
+            "description": "Passing drills",
+        }
+        for i in range(n)
+    ]
+
+
+def render_before(events) -> bytes:
+    content = jsonable_encoder({"events": events})
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def render_after(events) -> bytes:
+    return MongoJSONResponse(None).render({"events": events})
+
+
+def timed(fn, events, repeat: int) -> list:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(events)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def report(name: str, samples: list):
+    print(
+        f"{name:<28} median {statistics.median(samples):8.2f} ms"
+        f"   min {min(samples):8.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    events = sample_events(args.n)
+    print(f"{args.n} events, {args.repeat} runs each")
+    report("jsonable_encoder + json", timed(render_before, events, args.repeat))
+    report("MongoJSONResponse", timed(render_after, events, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Write latency of MongoDBService.create/update: read-after-write vs single trip.
+
+Before: insert_one + find_one, and update_one + find_one.
+After: insert_one with the response built locally, and find_one_and_update
+returning the post-image. Also reports the acknowledged-only fast mode.
+Runs against a scratch collection that is dropped afterwards:
+
+    python -m benchmarks.write_latency --url mongodb://localhost:27017 --n 2000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
+
+
+def sample_event() -> dict:
+    return {
+        "event_type": "Practice",
+        "place": "Field 2",
+        "event_date": datetime.utcnow(),
+        "description": "Passing drills",
+    }
+
+
+async def create_before(collection):
+    data = sample_event()
+    data["created_at"] = datetime.utcnow()
+    result = await collection.insert_one(data)
+    return await collection.find_one({"_id": result.inserted_id})
+
+
+async def create_after(collection):
+    data = sample_event()
+    data["created_at"] = datetime.utcnow()
+    result = await collection.insert_one(data)
+    return {**data, "_id": str(result.inserted_id)}
+
+
+async def create_ack(collection):
+    data = sample_event()
+    data["created_at"] = datetime.utcnow()
+    return str((await collection.insert_one(data)).inserted_id)
+
+
+async def update_before(collection, doc_id):
+    await collection.update_one({"_id": doc_id}, {"$set": {"place": "Field 3"}})
+    return await collection.find_one({"_id": doc_id})
+
+
+async def update_after(collection, doc_id):
+    return await collection.find_one_and_update(
+        {"_id": doc_id},
+        {"$set": {"place": "Field 3"}},
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def update_ack(collection, doc_id):
+    result = await collection.update_one(
+        {"_id": doc_id}, {"$set": {"place": "Field 3"}}
+    )
+    return result.matched_count > 0
+
+
+async def measure(name, op, n):
+    samples = []
+    for _ in range(n):
+        started = time.perf_counter()
+        await op()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    print(
+        f"{name:<22} p50 {statistics.median(samples):7.3f} ms"
+        f"   p99 {samples[int(len(samples) * 0.99) - 1]:7.3f} ms"
+    )
+
+
+async def main(url: str, n: int):
+    client = AsyncIOMotorClient(url)
+    collection = client["benchmarks"]["write_latency"]
+    await collection.drop()
+    doc_id = (await collection.insert_one(sample_event())).inserted_id
+
+    await measure("create (before)", lambda: create_before(collection), n)
+    await measure("create (after)", lambda: create_after(collection), n)
+    await measure("create (ack only)", lambda: create_ack(collection), n)
+    await measure("update (before)", lambda: update_before(collection, doc_id), n)
+    await measure("update (after)", lambda: update_after(collection, doc_id), n)
+    await measure("update (ack only)", lambda: update_ack(collection, doc_id), n)
+
+    await collection.drop()
+    client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="mongodb://localhost:27017")
+    parser.add_argument("--n", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.url, args.n))
@@ -1,4 +1,6 @@
-from fastapi import FastAPI, WebSocket, Depends
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, Query
+from fastapi_jwt_auth import AuthJWT
+from fastapi_jwt_auth.exceptions import AuthJWTException
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.routers.auth import auth_router
@@ -6,13 +8,67 @@ from app.routers.event import event_router
 from app.routers.team import team_router
 from app.routers.user import user_router
 from app.tools.RabbitClient import RabbitClient
+from app.tools.OutboxRelay import OutboxRelay
+from app.tools.ReceiptReconciler import ReceiptReconciler
+from app.tools.PushDispatcher import PushDispatcher
+from app.service.OutboxService import OutboxService
 from app.service.FirebaseService import FirebaseService
+from app.tools.ExponentServerSDK import async_push_client
+from app.service.AuthService import user_cache
+from app.service.MongoDBService import document_cache
+from app.database import ensure_indexes
+from app.utils import password_pool
+from app.oauth2 import auth_service
+from app.tools.WebSocketManager import manager, HeartbeatScheduler
+from app.tools.WebSocketBridge import WebSocketBridge
+from app.tools.JSONResponse import MongoJSONResponse
 
 
 class FooApp(FastAPI):
     def __init__(self, rabbit_url, firebase_cred_path, *args, **kwargs):
+        kwargs.setdefault("default_response_class", MongoJSONResponse)
         super().__init__(*args, **kwargs)
-        self.rabbit_client = RabbitClient(rabbit_url=rabbit_url)
+        self.receipt_reconciler = ReceiptReconciler(
+            async_push_client,
+            delay_seconds=settings.PUSH_RECEIPT_DELAY,
+            poll_interval=settings.PUSH_RECEIPT_POLL_INTERVAL,
+            batch_size=settings.PUSH_RECEIPT_BATCH_SIZE,
+        )
+        self.rabbit_client = RabbitClient(
+            rabbit_url=rabbit_url,
+            prefetch_count=settings.RABBIT_PREFETCH_COUNT,
+            concurrency=settings.RABBIT_CONSUMER_CONCURRENCY,
+            queue_concurrency=settings.RABBIT_QUEUE_CONCURRENCY,
+            drain_timeout=settings.RABBIT_DRAIN_TIMEOUT,
+            publish_channels=settings.RABBIT_PUBLISH_CHANNELS,
+            content_type=settings.RABBIT_CONTENT_TYPE,
+            coalesce_window=settings.NOTIFY_COALESCE_WINDOW,
+            coalesce_max_wait=settings.NOTIFY_COALESCE_MAX_WAIT,
+        )
+        self.push_dispatcher = PushDispatcher(
+            self.rabbit_client,
+            async_push_client,
+            receipt_reconciler=self.receipt_reconciler,
+            rate=settings.PUSH_RATE_LIMIT,
+            burst=settings.PUSH_RATE_BURST,
+            max_attempts=settings.PUSH_MAX_ATTEMPTS,
+            base_delay=settings.PUSH_RETRY_BASE_DELAY,
+        )
+        self.outbox_relay = OutboxRelay(
+            self.rabbit_client,
+            OutboxService(),
+            batch_size=settings.OUTBOX_BATCH_SIZE,
+            poll_interval=settings.OUTBOX_POLL_INTERVAL,
+            lease_seconds=settings.OUTBOX_LEASE_SECONDS,
+            max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+        )
+        self.websocket_bridge = WebSocketBridge(self.rabbit_client, manager)
+        self.heartbeat = HeartbeatScheduler(
+            manager,
+            interval=settings.WS_HEARTBEAT_INTERVAL,
+            timeout=settings.WS_HEARTBEAT_TIMEOUT,
+            slots=settings.WS_HEARTBEAT_SLOTS,
+        )
         self.firebase_service = FirebaseService(firebase_cred_path)
 
 
@@ -46,22 +102,83 @@ app.include_router(user_router, tags=["user_info"], prefix="/api/user_info")
 # )
 
 
+@app.get("/metrics", tags=["metrics"])
+async def metrics():
+    return {
+        "user_cache": user_cache.stats(),
+        "document_cache": document_cache.stats() if document_cache else None,
+        "password_pool": password_pool.stats(),
+        "outbox_relay": app.outbox_relay.stats(),
+        "websockets": manager.stats(),
+        "websocket_bridge": app.websocket_bridge.stats(),
+        "heartbeat": app.heartbeat.stats(),
+        "push_receipts": app.receipt_reconciler.stats(),
+        "push_dispatcher": app.push_dispatcher.stats(),
+        "notification_coalescer": (
+            app.rabbit_client.coalescer.stats()
+            if app.rabbit_client.coalescer
+            else None
+        ),
+        "indexes": getattr(app, "index_report", None),
+    }
+
+
+@app.websocket("/ws")
+async def websocket_endpoint(
+    websocket: WebSocket, token: str = Query(...), Authorize: AuthJWT = Depends()
+):
+    try:
+        Authorize.jwt_required("websocket", token=token)
+        user_id = Authorize.get_jwt_subject()
+    except AuthJWTException:
+        await websocket.close(code=1008)
+        return
+
+    user = await auth_service.get_cached_user(user_id)
+    if not user:
+        await websocket.close(code=1008)
+        return
+
+    await manager.connect(websocket, user_id, user.get("teams", []))
+    try:
+        while True:
+            await websocket.receive_text()
+            manager.touch(websocket)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        manager.disconnect(user_id, websocket)
+
+
 # Startup and Shutdown Events
 @app.on_event("startup")
 async def startup_event():
     # Connect to RabbitMQ
     app.firebase_service.init_firebase()
+    app.index_report = await ensure_indexes()
     await app.rabbit_client.start()
-    # await app.rabbit_client.declare_and_bind_queue(
-    #     queue_name="663be0c3b6f73eaa9b08b048",
-    #     routing_keys=["team.663be0c3b6f73eaa9b08b048.event.*"],
-    # )
-    await app.rabbit_client.start_consumer("66420eb2e00fde33e4329b05")
+    await app.push_dispatcher.start()
+    await app.outbox_relay.start()
+    await app.websocket_bridge.start()
+    await app.heartbeat.start()
+    await app.receipt_reconciler.start()
+    await app.rabbit_client.start_team_consumers(
+        shard_count=settings.TEAM_EVENT_SHARDS,
+        replica_index=settings.CONSUMER_REPLICA_INDEX,
+        replica_count=settings.CONSUMER_REPLICA_COUNT,
+    )
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     # Close RabbitMQ connection
     # stannsey
-    await rabbit_client.close()
+    await app.outbox_relay.stop()
+    await app.heartbeat.stop()
+    await app.receipt_reconciler.stop()
+    await app.websocket_bridge.stop()
+    await app.push_dispatcher.stop()
+    await app.rabbit_client.stop()
     print("RabbitMQ connection closed.")
+    await async_push_client.aclose()
+    password_pool.shutdown()
@@ -0,0 +1,48 @@
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("bson")
+orjson = pytest.importorskip("orjson")
+
+from bson import ObjectId  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+import app.models.event_schemas  # noqa: E402,F401
+import app.models.team_schemas  # noqa: E402,F401
+from app.serializers.eventSerializers import eventResponseEntity  # noqa: E402
+from app.serializers.userSerializer import userResponseEntity  # noqa: E402
+from app.tools.JSONResponse import MongoJSONResponse  # noqa: E402
+
+
+def test_renders_object_ids_and_datetimes():
+    event_id = ObjectId()
+    body = MongoJSONResponse(None).render(
+        {"_id": event_id, "event_date": datetime(2024, 5, 1, 15, 0)}
+    )
+    assert orjson.loads(body) == {
+        "_id": str(event_id),
+        "event_date": "2024-05-01T15:00:00",
+    }
+
+
+def test_response_entities_read_their_argument():
+    assert eventResponseEntity({"place": "Field 2"})["place"] == "Field 2"
+    user = {"_id": ObjectId(), "contact_info": {"email": "coach@example.com"}}
+    assert userResponseEntity(user)["email"] == "coach@example.com"
+
+
+def test_dict_and_mongo_responses_render_documents_alike():
+    # Handlers returning dicts go through jsonable_encoder and the encoders
+    # the schema modules register; both paths must give the same JSON.
+    document = {
+        "_id": ObjectId(),
+        "team_id": ObjectId(),
+        "event_date": datetime(2024, 5, 1, 12, 0),
+        "created_at": datetime(2024, 4, 30, 8, 15, 30, 250000),
+        "members": [{"user_id": ObjectId(), "joined": datetime(2024, 1, 2)}],
+    }
+    rendered = orjson.loads(MongoJSONResponse(None).render(document))
+    assert jsonable_encoder(document) == rendered
+    assert rendered["event_date"] == "2024-05-01T12:00:00"
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aio_pika")
+pytest.importorskip("pydantic")
+
+from app.tools.RabbitClient import _KeyedLocks  # noqa: E402
+
+
+def test_same_key_runs_in_arrival_order():
+    async def scenario():
+        locks = _KeyedLocks()
+        done = []
+
+        async def handle(key, n, delay):
+            async with locks.hold(key):
+                await asyncio.sleep(delay)
+                done.append((key, n))
+
+        # Earlier messages of a team take longer; order must still hold.
+        await asyncio.gather(
+            handle("team-a", 1, 0.03),
+            handle("team-a", 2, 0.01),
+            handle("team-a", 3, 0.0),
+        )
+        return done
+
+    assert asyncio.run(scenario()) == [("team-a", 1), ("team-a", 2), ("team-a", 3)]
+
+
+def test_different_keys_do_not_wait_for_each_other():
+    async def scenario():
+        locks = _KeyedLocks()
+        done = []
+
+        async def handle(key, delay):
+            async with locks.hold(key):
+                await asyncio.sleep(delay)
+                done.append(key)
+
+        await asyncio.gather(handle("team-a", 0.03), handle("team-b", 0.0))
+        return done
+
+    assert asyncio.run(scenario()) == ["team-b", "team-a"]
+
+
+def test_locks_are_dropped_when_unused():
+    async def scenario():
+        locks = _KeyedLocks()
+        async with locks.hold("team-a"):
+            pass
+        return locks._locks, locks._users
+
+    assert asyncio.run(scenario()) == ({}, {})
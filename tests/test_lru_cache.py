@@ -0,0 +1,66 @@
+import time
+
+from app.tools.LRUCache import LRUCache
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expires_entries_after_ttl():
+    cache = LRUCache(ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_counts_hits_and_misses():
+    cache = LRUCache()
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("b")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
+
+
+def test_load_is_cached_when_not_invalidated():
+    cache = LRUCache()
+    generation = cache.begin_load("user")
+    assert cache.end_load("user", generation, {"role": "Player"})
+    assert cache.get("user") == {"role": "Player"}
+
+
+def test_invalidate_during_load_discards_stale_value():
+    cache = LRUCache()
+    generation = cache.begin_load("user")
+    # The role changes and is invalidated while the old document is read.
+    cache.invalidate("user")
+    assert not cache.end_load("user", generation, {"role": "Player"})
+    assert cache.get("user") is None
+
+
+def test_later_load_after_invalidation_is_cached():
+    cache = LRUCache()
+    stale = cache.begin_load("user")
+    cache.invalidate("user")
+    fresh = cache.begin_load("user")
+    cache.end_load("user", stale, {"role": "Player"})
+    cache.end_load("user", fresh, {"role": "Coach"})
+    assert cache.get("user") == {"role": "Coach"}
+
+
+def test_failed_load_releases_tracking():
+    cache = LRUCache()
+    generation = cache.begin_load("user")
+    cache.end_load("user", generation)
+    assert cache.get("user") is None
+    assert not cache._loads
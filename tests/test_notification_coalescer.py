@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aio_pika")
+
+from app.tools.NotificationCoalescer import NotificationCoalescer  # noqa: E402
+
+
+class FakeMessage:
+    def __init__(self):
+        self.acked = False
+        self.rejected = False
+
+    async def ack(self):
+        self.acked = True
+
+    async def reject(self, requeue=False):
+        self.rejected = True
+
+
+def run(scenario):
+    return asyncio.run(scenario())
+
+
+def test_burst_for_one_event_sends_once_with_latest_data():
+    sent = []
+    messages = [FakeMessage() for _ in range(3)]
+
+    async def scenario():
+        async def flush(data):
+            sent.append(data)
+
+        coalescer = NotificationCoalescer(flush, window=0.05, max_wait=1.0)
+        for version, message in enumerate(messages):
+            coalescer.submit(("team", "event"), message, version)
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.1)
+        return coalescer.stats()
+
+    stats = run(scenario)
+    assert sent == [2]
+    assert all(message.acked for message in messages)
+    assert stats == {"pending": 0, "flushed": 1, "pushes_saved": 2}
+
+
+def test_different_events_are_not_merged():
+    sent = []
+
+    async def scenario():
+        async def flush(data):
+            sent.append(data)
+
+        coalescer = NotificationCoalescer(flush, window=0.02, max_wait=1.0)
+        coalescer.submit(("team", "a"), FakeMessage(), "a")
+        coalescer.submit(("team", "b"), FakeMessage(), "b")
+        await asyncio.sleep(0.06)
+
+    run(scenario)
+    assert sorted(sent) == ["a", "b"]
+
+
+def test_max_wait_bounds_a_continuous_stream():
+    sent = []
+
+    async def scenario():
+        async def flush(data):
+            sent.append(data)
+
+        coalescer = NotificationCoalescer(flush, window=0.05, max_wait=0.1)
+        for version in range(10):
+            coalescer.submit("key", FakeMessage(), version)
+            await asyncio.sleep(0.03)
+        await asyncio.sleep(0.1)
+
+    run(scenario)
+    assert len(sent) >= 2
+    assert sent[-1] == 9
+
+
+def test_failed_flush_rejects_the_whole_burst():
+    messages = [FakeMessage(), FakeMessage()]
+
+    async def scenario():
+        async def flush(data):
+            raise RuntimeError("Expo down")
+
+        coalescer = NotificationCoalescer(flush, window=0.01, max_wait=1.0)
+        for message in messages:
+            coalescer.submit("key", message, None)
+        await asyncio.sleep(0.05)
+
+    run(scenario)
+    assert all(message.rejected and not message.acked for message in messages)
+
+
+def test_drain_flushes_held_bursts_immediately():
+    sent = []
+    message = FakeMessage()
+
+    async def scenario():
+        async def flush(data):
+            sent.append(data)
+
+        coalescer = NotificationCoalescer(flush, window=60, max_wait=60)
+        coalescer.submit("key", message, "payload")
+        await coalescer.drain()
+        return coalescer.stats()["pending"]
+
+    assert run(scenario) == 0
+    assert sent == ["payload"] and message.acked
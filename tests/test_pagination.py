@@ -0,0 +1,111 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("motor")
+pytest.importorskip("pydantic")
+
+from bson import ObjectId  # noqa: E402
+from pymongo import ASCENDING, DESCENDING  # noqa: E402
+
+from app.service.MongoDBService import MongoDBService  # noqa: E402
+from app.utils import decode_cursor, encode_cursor  # noqa: E402
+
+
+class FakeCollection:
+    """Returns canned documents and records the query it was given."""
+
+    name = "events"
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.query = None
+        self.sort_spec = None
+
+    def find(self, query, projection=None):
+        self.query = query
+        return self
+
+    def sort(self, spec):
+        self.sort_spec = spec
+        return self
+
+    async def to_list(self, length):
+        return [dict(document) for document in self.documents[:length]]
+
+
+def events(n):
+    start = datetime(2024, 5, 1)
+    return [
+        {"_id": ObjectId(), "event_date": start + timedelta(days=i)} for i in range(n)
+    ]
+
+
+def paginate(documents, **kwargs):
+    collection = FakeCollection(documents)
+    page = asyncio.run(
+        MongoDBService(collection).paginate(
+            {"team_id": 1}, sort_field="event_date", **kwargs
+        )
+    )
+    return collection, page
+
+
+def test_cursor_round_trips_bson_values():
+    value = [datetime(2024, 5, 1, 12, 30), ObjectId()]
+    assert decode_cursor(encode_cursor(value)) == value
+
+
+def test_keyset_filter_breaks_ties_on_id():
+    date, last_id = datetime(2024, 5, 1), ObjectId()
+    cursor = encode_cursor([date, last_id])
+    assert MongoDBService.keyset_filter("event_date", cursor, "$gt") == {
+        "$or": [
+            {"event_date": {"$gt": date}},
+            {"event_date": date, "_id": {"$gt": last_id}},
+        ]
+    }
+
+
+def test_keyset_filter_rejects_malformed_cursor():
+    with pytest.raises(ValueError):
+        MongoDBService.keyset_filter("event_date", "not a cursor", "$gt")
+
+
+def test_first_page_has_only_next_cursor():
+    documents = events(3)
+    collection, page = paginate(documents, limit=2)
+    assert [d["_id"] for d in page["items"]] == [d["_id"] for d in documents[:2]]
+    assert decode_cursor(page["next_cursor"]) == [
+        documents[1]["event_date"],
+        documents[1]["_id"],
+    ]
+    assert page["prev_cursor"] is None
+    assert collection.sort_spec == [("event_date", ASCENDING), ("_id", ASCENDING)]
+
+
+def test_last_page_after_cursor_has_only_prev_cursor():
+    documents = events(2)
+    cursor = encode_cursor([datetime(2024, 4, 1), ObjectId()])
+    collection, page = paginate(documents, limit=2, after=cursor)
+    assert page["next_cursor"] is None
+    assert page["prev_cursor"] is not None
+    assert collection.query["$and"][0] == {"team_id": 1}
+
+
+def test_before_cursor_reads_backwards_and_restores_order():
+    documents = events(3)
+    cursor = encode_cursor([datetime(2024, 6, 1), ObjectId()])
+    # The collection answers in descending order for a before cursor.
+    collection, page = paginate(list(reversed(documents)), limit=2, before=cursor)
+    assert collection.sort_spec == [("event_date", DESCENDING), ("_id", DESCENDING)]
+    assert [d["_id"] for d in page["items"]] == [d["_id"] for d in documents[1:]]
+    assert page["next_cursor"] is not None
+    assert page["prev_cursor"] is not None
+
+
+def test_after_and_before_together_are_rejected():
+    cursor = encode_cursor([datetime(2024, 5, 1), ObjectId()])
+    with pytest.raises(ValueError):
+        paginate(events(3), limit=2, after=cursor, before=cursor)
@@ -0,0 +1,117 @@
+import asyncio
+import json
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("requests")
+
+from app.tools.ExponentServerSDK import (  # noqa: E402
+    AsyncPushClient,
+    PushMessage,
+    PushTicket,
+)
+
+
+def message(to, body="hello", data=None):
+    return PushMessage(to=to, body=body, data=data)
+
+
+def oversize(to):
+    return message(to, data={"blob": "x" * AsyncPushClient.MAX_PAYLOAD_BYTES})
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self._data = data
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        pass
+
+
+class RecordingClient(AsyncPushClient):
+    """Answers /push/send with one ok ticket per recipient in the body."""
+
+    def __init__(self):
+        super().__init__()
+        self.bodies = []
+
+    async def _post_body(self, path, body):
+        sent = json.loads(body)
+        self.bodies.append(sent)
+        recipients = [
+            to
+            for item in sent
+            for to in (item["to"] if isinstance(item["to"], list) else [item["to"]])
+        ]
+        return FakeResponse(
+            {"data": [{"status": "ok", "id": f"id-{to}"} for to in recipients]}
+        )
+
+
+def test_async_client_has_finite_default_timeout():
+    client = AsyncPushClient()
+    assert isinstance(client.timeout, httpx.Timeout)
+    assert client.timeout.read == AsyncPushClient.DEFAULT_TIMEOUT
+
+
+def test_async_client_keeps_explicit_timeout():
+    assert AsyncPushClient(timeout=3).timeout == 3
+
+
+def test_identical_messages_share_one_body_with_array_to():
+    client = AsyncPushClient()
+    body, sendable, tickets = client.encode_messages(
+        [message("a"), message("b"), message("c")]
+    )
+    assert json.loads(body) == [{"to": ["a", "b", "c"], "body": "hello"}]
+    assert len(sendable) == 3
+    assert tickets == [None, None, None]
+
+
+def test_mixed_messages_are_encoded_one_by_one():
+    client = AsyncPushClient()
+    body, _, _ = client.encode_messages([message("a"), message("b", body="other")])
+    assert json.loads(body) == [
+        {"to": "a", "body": "hello"},
+        {"to": "b", "body": "other"},
+    ]
+
+
+def test_message_with_only_a_recipient():
+    body, _, _ = AsyncPushClient().encode_messages([PushMessage(to="a")])
+    assert json.loads(body) == [{"to": "a"}]
+
+
+def test_oversize_message_gets_a_ticket_instead_of_being_sent():
+    client = AsyncPushClient()
+    body, sendable, tickets = client.encode_messages(
+        [message("a"), oversize("b"), message("c")]
+    )
+    assert json.loads(body) == [{"to": ["a", "c"], "body": "hello"}]
+    assert [m.to for m in sendable] == ["a", "c"]
+    assert tickets[0] is None and tickets[2] is None
+    assert tickets[1].push_message.to == "b"
+    assert tickets[1].status == PushTicket.ERROR_STATUS
+    assert tickets[1].details == {"error": PushTicket.ERROR_MESSAGE_TOO_BIG}
+
+
+def test_publish_keeps_ticket_order_around_oversize_messages():
+    client = RecordingClient()
+    tickets = asyncio.run(
+        client._publish_internal([oversize("a"), message("b"), message("c")])
+    )
+    assert client.bodies == [[{"to": ["b", "c"], "body": "hello"}]]
+    assert [t.push_message.to for t in tickets] == ["a", "b", "c"]
+    assert [t.id for t in tickets] == ["", "id-b", "id-c"]
+    assert not tickets[0].is_success()
+
+
+def test_chunk_of_only_oversize_messages_is_not_sent():
+    client = RecordingClient()
+    tickets = asyncio.run(client._publish_internal([oversize("a")]))
+    assert client.bodies == []
+    assert tickets[0].details == {"error": PushTicket.ERROR_MESSAGE_TOO_BIG}
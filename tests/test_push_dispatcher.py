@@ -0,0 +1,127 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("aio_pika")
+pytest.importorskip("bson")
+pytest.importorskip("msgpack")
+pytest.importorskip("httpx")
+pytest.importorskip("requests")
+
+from app.tools.ExponentServerSDK import AsyncPushClient, PushMessage  # noqa: E402
+from app.tools import PushDispatcher as dispatcher_module  # noqa: E402
+from app.tools.PushDispatcher import PushDispatcher  # noqa: E402
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self._data = data
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        pass
+
+
+class FakePushClient(AsyncPushClient):
+    def __init__(self):
+        super().__init__()
+        self.sent = []
+
+    async def _post_body(self, path, body):
+        items = json.loads(body)
+        self.sent.extend(items)
+        return FakeResponse({"data": [{"status": "ok", "id": "x"} for _ in items]})
+
+
+class FakeRabbitClient:
+    exchange_name = "events"
+    drain_timeout = 1.0
+
+    def __init__(self):
+        self.cancelled = []
+
+    async def cancel_consumer(self, queue_name):
+        self.cancelled.append(queue_name)
+
+
+def test_oversize_message_is_parked_alone():
+    dispatcher = PushDispatcher(FakeRabbitClient(), FakePushClient())
+    published = []
+
+    async def publish(routing_key, messages, attempt, error):
+        published.append((routing_key, [m.to for m in messages], error))
+
+    dispatcher._publish = publish
+    big = {"blob": "x" * AsyncPushClient.MAX_PAYLOAD_BYTES}
+    chunk = [
+        PushMessage(to="a", body="hi"),
+        PushMessage(to="b", body="hi", data=big),
+        PushMessage(to="c", body="other"),
+    ]
+    asyncio.run(dispatcher.dispatch(chunk))
+
+    assert [item["to"] for item in dispatcher.push_client.sent] == ["a", "c"]
+    assert published == [("dead", ["b"], "MessageTooBig")]
+    assert dispatcher.parked == 1
+
+
+def recording_dispatcher(**kwargs):
+    dispatcher = PushDispatcher(FakeRabbitClient(), FakePushClient(), **kwargs)
+    published = []
+
+    async def publish(routing_key, messages, attempt, error):
+        published.append((routing_key, attempt))
+
+    dispatcher._publish = publish
+    return dispatcher, published
+
+
+def test_retry_delays_are_spread_over_the_upper_half_of_the_backoff():
+    dispatcher, _ = recording_dispatcher(base_delay=2.0, jitter_tiers=4)
+    assert [dispatcher._delay_ms(0, tier) for tier in range(4)] == [
+        1250,
+        1500,
+        1750,
+        2000,
+    ]
+    assert dispatcher._delay_ms(2, 3) == 8000
+
+
+def test_retry_is_routed_to_a_random_tier_of_its_attempt(monkeypatch):
+    dispatcher, published = recording_dispatcher(base_delay=2.0, jitter_tiers=4)
+    tiers = iter([0, 3])
+    monkeypatch.setattr(dispatcher_module.random, "randrange", lambda n: next(tiers))
+    message = [PushMessage(to="a")]
+    asyncio.run(dispatcher._retry(message, 0, "429"))
+    asyncio.run(dispatcher._retry(message, 1, "429"))
+
+    assert published == [("retry.1250ms", 1), ("retry.4000ms", 2)]
+    assert dispatcher.retried == 2
+
+
+def test_retry_past_max_attempts_is_parked():
+    dispatcher, published = recording_dispatcher(max_attempts=2)
+    asyncio.run(dispatcher._retry([PushMessage(to="a")], 2, "429"))
+    assert published == [("dead", 2)]
+
+
+def test_stop_cancels_retries_and_waits_for_sends_in_flight():
+    class SlowPushClient(FakePushClient):
+        async def _post_body(self, path, body):
+            await asyncio.sleep(0.05)
+            return await super()._post_body(path, body)
+
+    dispatcher = PushDispatcher(FakeRabbitClient(), SlowPushClient())
+
+    async def scenario():
+        sending = asyncio.create_task(dispatcher.dispatch([PushMessage(to="a")]))
+        await asyncio.sleep(0)
+        await dispatcher.stop()
+        return sending.done()
+
+    assert asyncio.run(scenario())
+    assert dispatcher.rabbit_client.cancelled == [PushDispatcher.DISPATCH_QUEUE]
+    assert dispatcher.sent == 1
@@ -0,0 +1,206 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+bson = pytest.importorskip("bson")
+
+from app.tools.Cache import (  # noqa: E402
+    MemoryCacheBackend,
+    ReadThroughCache,
+    RedisCacheBackend,
+)
+
+
+class FakeRedis:
+    """The part of redis.asyncio.Redis that RedisCacheBackend uses."""
+
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        assert isinstance(value, bytes)
+        self.values[key] = value
+        self.ttls[key] = ex
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+            self.ttls.pop(key, None)
+
+
+@pytest.fixture(params=["memory", "redis"])
+def make_cache(request):
+    def make():
+        if request.param == "memory":
+            backend = MemoryCacheBackend(maxsize=100)
+        else:
+            backend = RedisCacheBackend(FakeRedis())
+        return ReadThroughCache(backend, {"teams": 30})
+
+    return make
+
+
+def test_loads_once_then_serves_from_backend(make_cache):
+    async def scenario():
+        cache, calls = make_cache(), []
+
+        async def loader():
+            calls.append(1)
+            return {"name": "U12"}
+
+        first = await cache.get_or_load("teams", "t1", loader)
+        second = await cache.get_or_load("teams", "t1", loader)
+        return first, second, len(calls)
+
+    assert asyncio.run(scenario()) == ({"name": "U12"}, {"name": "U12"}, 1)
+
+
+def test_concurrent_misses_share_one_load(make_cache):
+    async def scenario():
+        cache, calls = make_cache(), []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"name": "U12"}
+
+        results = await asyncio.gather(
+            *(cache.get_or_load("teams", "t1", loader) for _ in range(5))
+        )
+        return results, len(calls), cache.stats()["coalesced"]
+
+    results, loads, coalesced = asyncio.run(scenario())
+    assert results == [{"name": "U12"}] * 5
+    assert (loads, coalesced) == (1, 4)
+
+
+def test_invalidate_during_load_is_not_overwritten(make_cache):
+    async def scenario():
+        cache = make_cache()
+        db = {"name": "old"}
+        read_done = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow_loader():
+            document = dict(db)
+            read_done.set()
+            await release.wait()
+            return document
+
+        load = asyncio.create_task(cache.get_or_load("teams", "t1", slow_loader))
+        await read_done.wait()
+        # An update commits and invalidates while the old read is in flight.
+        db["name"] = "new"
+        await cache.invalidate("teams", "t1")
+        release.set()
+        stale = await load
+
+        async def loader():
+            return dict(db)
+
+        return stale, await cache.get_or_load("teams", "t1", loader)
+
+    stale, fresh = asyncio.run(scenario())
+    assert stale == {"name": "old"}
+    assert fresh == {"name": "new"}
+
+
+def test_miss_after_invalidate_does_not_join_stale_load(make_cache):
+    async def scenario():
+        cache = make_cache()
+        release = asyncio.Event()
+
+        async def stale_loader():
+            await release.wait()
+            return {"name": "old"}
+
+        async def fresh_loader():
+            return {"name": "new"}
+
+        stale = asyncio.create_task(cache.get_or_load("teams", "t1", stale_loader))
+        await asyncio.sleep(0)
+        await cache.invalidate("teams", "t1")
+        # Joining the detached load would wait on release forever.
+        fresh = await asyncio.wait_for(
+            cache.get_or_load("teams", "t1", fresh_loader), timeout=1
+        )
+        release.set()
+        await stale
+        return fresh, await cache.get_or_load("teams", "t1", stale_loader)
+
+    assert asyncio.run(scenario()) == ({"name": "new"}, {"name": "new"})
+
+
+def test_returned_documents_are_copies(make_cache):
+    async def scenario():
+        cache = make_cache()
+
+        async def loader():
+            return {"name": "U12"}
+
+        document = await cache.get_or_load("teams", "t1", loader)
+        document["name"] = "changed"
+        return await cache.get_or_load("teams", "t1", loader)
+
+    assert asyncio.run(scenario()) == {"name": "U12"}
+
+
+def test_nested_values_are_copies(make_cache):
+    async def scenario():
+        cache = make_cache()
+
+        async def loader():
+            return {"teams": ["t1"]}
+
+        document = await cache.get_or_load("teams", "u1", loader)
+        document["teams"].append("t2")
+        cached = await cache.get_or_load("teams", "u1", loader)
+        cached["teams"].append("t3")
+        return await cache.get_or_load("teams", "u1", loader)
+
+    assert asyncio.run(scenario()) == {"teams": ["t1"]}
+
+
+def test_redis_backend_round_trips_bson_with_ttl():
+    document = {
+        "_id": bson.ObjectId(),
+        "created_at": datetime(2024, 5, 1, 12, 0),
+        "teams": [bson.ObjectId()],
+    }
+
+    async def scenario():
+        client = FakeRedis()
+        cache = ReadThroughCache(RedisCacheBackend(client), {"teams": 30})
+
+        async def loader():
+            return document
+
+        await cache.get_or_load("teams", "t1", loader)
+        cached = await cache.backend.get("teams:t1")
+        return client, cached, cache.stats()
+
+    client, cached, stats = asyncio.run(scenario())
+    assert cached == document
+    assert client.ttls == {"teams:t1": 30}
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_redis_backend_deletes_on_invalidate():
+    async def scenario():
+        client = FakeRedis()
+        cache = ReadThroughCache(RedisCacheBackend(client), {"teams": 30})
+
+        async def loader():
+            return {"name": "U12"}
+
+        await cache.get_or_load("teams", "t1", loader)
+        await cache.get_or_load("teams", "t2", loader)
+        await cache.invalidate("teams", "t1", "t2")
+        return client.values
+
+    assert asyncio.run(scenario()) == {}
@@ -0,0 +1,50 @@
+import asyncio
+import time
+
+from app.tools.TokenBucket import TokenBucket
+
+
+def elapsed(coro_factory) -> float:
+    async def scenario():
+        started = time.monotonic()
+        await coro_factory()
+        return time.monotonic() - started
+
+    return asyncio.run(scenario())
+
+
+def test_burst_up_to_capacity_does_not_wait():
+    bucket = TokenBucket(rate=100, capacity=100)
+    assert elapsed(lambda: bucket.acquire(100)) < 0.05
+
+
+def test_waits_for_refill_beyond_capacity():
+    bucket = TokenBucket(rate=100, capacity=100)
+
+    async def take():
+        await bucket.acquire(100)
+        await bucket.acquire(50)
+
+    assert 0.4 <= elapsed(take) < 0.8
+    assert bucket.stats()["waited_seconds"] >= 0.4
+
+
+def test_request_larger_than_capacity_is_capped():
+    bucket = TokenBucket(rate=1000, capacity=10)
+    assert elapsed(lambda: bucket.acquire(500)) < 0.05
+
+
+def test_waiters_are_served_in_arrival_order():
+    bucket = TokenBucket(rate=100, capacity=10)
+    order = []
+
+    async def take(name, n):
+        await bucket.acquire(n)
+        order.append(name)
+
+    async def scenario():
+        await bucket.acquire(10)
+        await asyncio.gather(take("large", 10), take("small", 1))
+
+    asyncio.run(scenario())
+    assert order == ["large", "small"]